@@ -24,6 +24,83 @@ class Settings(BaseSettings):
     BASE_LOAD_DAY: float = 0.35
     AC_COEFF: float = 0.28
 
+    # Forecast model store di disk (dipakai bersama semua worker; pakai volume persisten di production)
+    FORECAST_STORE_DIR: str = "/tmp/bima_forecast_models"
+    # Forecast model cache (in-process, per worker)
+    FORECAST_MODEL_CACHE_SIZE: int = 32
+    FORECAST_MODEL_CACHE_MAX_MB: int = 256
+    # Cache response endpoint forecast (per worker): TTL + batas memori; setiap hit dicek ulang
+    # terhadap watermark data window di DB
+    FORECAST_RESPONSE_CACHE_TTL_S: int = 3600
+    FORECAST_RESPONSE_CACHE_SIZE: int = 1024
+    FORECAST_RESPONSE_CACHE_MAX_MB: int = 32
+    # Cache deret historis per window; query agregasi di-skip selama watermark data tidak berubah
+    FORECAST_SERIES_CACHE_SIZE: int = 64
+    # Default stale-while-revalidate untuk endpoint forecast (bisa override via ?stale_ok=)
+    FORECAST_STALE_WHILE_REVALIDATE: bool = False
+    # Warm-start: fine-tune model lama pada window baru saja (fallback full retrain)
+    FORECAST_INCREMENTAL_TRAINING: bool = True
+    FORECAST_INCREMENTAL_EPOCHS: int = 3
+    FORECAST_INCREMENTAL_MAX_UPDATES: int = 24
+    # Retrain policy LSTM/RNN: "data" (latih ulang setiap deret input berubah) atau "drift"
+    # (model lama tetap dipakai kecuali lebih tua dari MAX_AGE_S, deret keluar dari range
+    # scaler, atau MAE forecast terealisasi > ERROR_RATIO x error validasi saat training,
+    # minimal MIN_ERROR; keduanya dalam fraksi range scaler)
+    FORECAST_RETRAIN_POLICY: str = "data"
+    FORECAST_RETRAIN_MAX_AGE_S: int = 24 * 3600
+    FORECAST_RETRAIN_ERROR_RATIO: float = 2.0
+    FORECAST_RETRAIN_MIN_ERROR: float = 0.05
+    FORECAST_RETRAIN_ERROR_WINDOW: int = 48  # titik forecast terealisasi terakhir yang dinilai
+    FORECAST_RETRAIN_MIN_ERROR_POINTS: int = 6
+    # Full training: early stopping pada val_loss (window validasi diambil dari deret training)
+    # dan batas wall-clock per training; epochs per granularity hanya jadi batas atas
+    FORECAST_EARLY_STOPPING: bool = True
+    FORECAST_EARLY_STOPPING_PATIENCE: int = 2
+    FORECAST_VALIDATION_FRACTION: float = 0.2
+    FORECAST_TRAIN_TIME_BUDGET_S: float = 20.0  # 0 = tanpa batas waktu
+    # Executor training terpisah dari threadpool request: jumlah training paralel, kapasitas
+    # antrean (penuh -> 503) dan thread TensorFlow per op (0 = default TF, semua core).
+    # Dengan 1 worker kandidat lstm + rnn model_type=auto dinilai berurutan; set >= 2 agar
+    # bersamaan (setiap worker training menambah INTRA_OP_THREADS thread + memori model/graph)
+    FORECAST_TRAIN_WORKERS: int = 1
+    FORECAST_TRAIN_QUEUE_SIZE: int = 4
+    FORECAST_TF_INTRA_OP_THREADS: int = 2
+    FORECAST_TF_INTER_OP_THREADS: int = 1
+    # model_type=auto: model lstm + rnn biasa dinilai dengan val_loss (ekor validasi) di manifest-nya;
+    # pilihan disimpan dan dinilai ulang setelah REEVALUATE_S
+    FORECAST_AUTO_REEVALUATE_S: int = 24 * 3600
+    # Precompute forecast default (tabel forecast_results) setelah setiap insert hourly_job.
+    # Opt-in: training Keras-nya bersaing dengan request di executor training (antrean penuh -> 503);
+    # model type default hanya lstm (default endpoint) + model klasik yang murah
+    FORECAST_PRECOMPUTE_ENABLED: bool = False
+    FORECAST_PRECOMPUTE_MODEL_TYPES: str = "lstm,snaive,holt_winters,ridge_ar"
+    # Mode hierarchical: daily/weekly/monthly dari satu model hourly (+ satu model harian jika
+    # HIERARCHICAL_DAILY_MODEL), angka harian direkonsiliasi dengan forecast hourly
+    FORECAST_HIERARCHICAL: bool = False
+    FORECAST_HIERARCHICAL_DAILY_MODEL: bool = True
+    # Model window-invariant: satu model per metric x model_type x frekuensi (hourly / harian),
+    # dilatih pada histori penuh dan dilatih ulang jika lebih tua dari REFRESH_S; window request
+    # (hours/days/ref) hanya dipakai sebagai input forecast
+    FORECAST_GLOBAL_MODELS: bool = False
+    FORECAST_GLOBAL_HISTORY_HOURS: int = 24 * 60
+    FORECAST_GLOBAL_HISTORY_DAYS: int = 365
+    FORECAST_GLOBAL_REFRESH_S: int = 6 * 3600
+    # Fitur exogenous LSTM/RNN: kalender (jam, hari, jam kerja) + temperatur untuk energy_kwh
+    FORECAST_EXOGENOUS: bool = False
+    # Jumlah sampel MC dropout untuk prediction interval (?intervals=true), dijalankan sebagai satu batch
+    FORECAST_MC_SAMPLES: int = 100
+    # Export TFLite inference-only saat menyimpan model (hanya jika FORECAST_SERVING_BACKEND="tflite"):
+    # "float16", "int8" (dynamic range), "none" (float32) atau "off" (tidak export)
+    FORECAST_TFLITE_QUANTIZATION: str = "float16"
+    # Backend serving model dari cache disk: "numpy" (.npz, tanpa TensorFlow), "keras" (weights
+    # .npz di template ter-compile) atau "tflite" (.tflite; fallback ke backend keras jika model
+    # belum punya export TFLite). "tflite" hanya ringan jika ai-edge-litert / tflite-runtime
+    # ter-install, tanpa itu interpreter-nya ikut import TensorFlow
+    FORECAST_SERVING_BACKEND: str = "numpy"
+    # Template model Keras ter-compile yang disimpan per arsitektur (model_type, look_back,
+    # fitur) untuk dipakai ulang oleh training / backend keras tanpa build + trace ulang
+    FORECAST_TEMPLATE_POOL_IDLE: int = 2
+
     class Config:
         env_file = ".env"
 
@@ -1,3 +1,8 @@
+import logging
+import time
+
+_IMPORT_T0 = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
@@ -19,6 +24,8 @@ from app.realtime.scheduler import scheduler, setup_scheduler   # <— tambahkan
 from app.realtime.routers.grafik import router as monitoring_series 
 
 setup_logging()
+logger = logging.getLogger(__name__)
+logger.info("[startup] import app selesai dalam %.0f ms", (time.perf_counter() - _IMPORT_T0) * 1000.0)
 app = FastAPI(title=settings.APP_NAME, version=settings.APP_VERSION)
 
 app.add_middleware(
@@ -55,8 +62,10 @@ def status():
 
 @app.on_event("startup")
 def on_startup():
+    t0 = time.perf_counter()
     init_table()
     if settings.ENABLE_SCHEDULER:
         setup_scheduler()                 # <— DAFTARKAN JOB DI SINI
         if not scheduler.running:
-            scheduler.start()  
\ No newline at end of file
+            scheduler.start()
+    logger.info("[startup] on_startup selesai dalam %.0f ms", (time.perf_counter() - t0) * 1000.0)  
\ No newline at end of file
@@ -39,6 +39,20 @@ def init_table():
         created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
     );
     CREATE INDEX IF NOT EXISTS idx_sensor_hourly_ts_desc ON sensor_hourly (ts DESC);
+
+    -- Forecast default yang dihitung scheduler setelah setiap insert (lihat forecast_service)
+    CREATE TABLE IF NOT EXISTS forecast_results (
+        granularity TEXT NOT NULL,           -- daily / weekly / monthly
+        metric TEXT NOT NULL,
+        model_type TEXT NOT NULL,
+        ref_hour TIMESTAMPTZ NOT NULL,       -- jam referensi saat dihitung
+        wm_max_ts TIMESTAMPTZ,               -- watermark window historis
+        wm_count INTEGER NOT NULL,
+        wm_max_created TIMESTAMPTZ,
+        payload JSONB NOT NULL,              -- response endpoint lengkap
+        computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (granularity, metric, model_type)
+    );
     """
     with get_conn() as conn, conn.cursor() as cur:
         cur.execute(ddl)
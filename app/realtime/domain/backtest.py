@@ -0,0 +1,255 @@
+"""
+Rolling-origin backtest untuk semua forecaster (lstm, rnn, snaive, holt_winters, ridge_ar).
+
+Untuk setiap origin: latih model pada `history` titik sebelum origin, forecast `steps`
+ke depan, bandingkan dengan data aktual setelah origin. Origin digeser mundur dari
+ujung deret sebanyak `stride` titik (default = steps, horizon tidak overlap).
+
+Per (model_type, granularity) dilaporkan MAE/RMSE beserta biaya: waktu training,
+waktu inference (termasuk trace tf.function pertama, sama seperti model baru di
+serving) dan peak RSS proses (+ kenaikannya) selama training + inference.
+
+Data: deret hourly berbentuk sensor_hourly (values + timestamp WIB), dari database
+atau sintetis (generator.generate_hour). Granularity weekly/monthly memakai agregat
+harian dari deret yang sama, seperti endpoint forecast.
+
+Model Keras dilatih dengan fit_keras_forecaster (tanpa cache/store), jadi backtest
+tidak mengganggu model yang dipakai serving. exog=True: lstm/rnn dengan fitur kalender
+(exogenous.py) untuk membandingkan akurasi dan epoch sampai konvergen.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import resource
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..generator import WIB, generate_hour
+from .classical import CLASSICAL_MODEL_TYPES, fit_classical, future_timestamps
+from .exogenous import future_exog_features, with_exog
+from .forecast import (
+    LOOK_BACK,
+    MULTIVARIATE_HORIZONS,
+    fit_keras_forecaster,
+    forecast_ahead,
+    last_sequence_for,
+)
+
+BACKTEST_MODEL_TYPES = ("lstm", "rnn") + CLASSICAL_MODEL_TYPES
+# Histori training per granularity (sama dengan default endpoint: 72 jam / 90 hari)
+BACKTEST_HISTORY = {"daily": 72, "weekly": 90, "monthly": 90}
+_HISTORY_FREQ = {"daily": "hourly", "weekly": "daily", "monthly": "daily"}
+
+# Nama metric API -> key row generator.generate_hour
+_GENERATOR_KEYS = {"ppv": "pmv"}
+
+RSS_SAMPLE_INTERVAL_S = 0.01
+
+
+# ======================== Data ========================
+
+def synthetic_hourly(
+    days: int,
+    metric: str = "temp",
+    end: Optional[datetime] = None,
+    seed: int = 123,
+) -> Tuple[np.ndarray, List[datetime]]:
+    """Deret hourly sintetis (generator.generate_hour) sepanjang `days` hari, berakhir di `end` (WIB)."""
+    end = (end or datetime.now(tz=WIB)).replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(hours=24 * days)
+    key = _GENERATOR_KEYS.get(metric, metric)
+    np.random.seed(seed)  # generator memakai global RNG NumPy
+    timestamps = [start + timedelta(hours=i) for i in range(24 * days)]
+    values = np.array([generate_hour(ts)[key] for ts in timestamps], dtype=float)
+    return values, timestamps
+
+
+def aggregate_daily(values: np.ndarray, timestamps: Sequence[datetime]) -> Tuple[np.ndarray, List[datetime]]:
+    """Rata-rata per hari (WIB), sama seperti bucket date_trunc('day') endpoint weekly/monthly."""
+    days = [ts.replace(hour=0, minute=0, second=0, microsecond=0) for ts in timestamps]
+    unique_days = sorted(set(days))
+    index = {d: i for i, d in enumerate(unique_days)}
+    group = np.array([index[d] for d in days])
+    sums = np.bincount(group, weights=values, minlength=len(unique_days))
+    counts = np.bincount(group, minlength=len(unique_days))
+    return sums / counts, unique_days
+
+
+def rolling_origins(n: int, history: int, steps: int, n_origins: int, stride: Optional[int] = None) -> List[int]:
+    """Index origin (ascending): training = [o - history, o), aktual = [o, o + steps)."""
+    stride = stride or steps
+    origins = [n - steps - k * stride for k in range(n_origins)]
+    return sorted(o for o in origins if o >= history)
+
+
+# ======================== Measurement ========================
+
+class _PeakRSS:
+    """
+    Sampling RSS proses di background thread; peak_mb = RSS maksimum selama blok `with`,
+    delta_mb = peak_mb dikurangi RSS saat masuk blok (memori tambahan model ini).
+    """
+
+    def __init__(self):
+        self.start_mb = 0.0
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def current_mb() -> float:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, ValueError):  # non-Linux: peak seumur proses
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, self.current_mb())
+            self._stop.wait(RSS_SAMPLE_INTERVAL_S)
+
+    @property
+    def delta_mb(self) -> float:
+        return self.peak_mb - self.start_mb
+
+    def __enter__(self) -> "_PeakRSS":
+        self.start_mb = self.peak_mb = self.current_mb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, self.current_mb())
+
+
+def _fit_and_forecast(
+    model_type: str,
+    train_values: np.ndarray,
+    train_timestamps: List[datetime],
+    freq: str,
+    steps: int,
+    epochs: int,
+    exog: bool = False,
+) -> Tuple[np.ndarray, float, float, Optional[int]]:
+    """Returns (forecast, train_s, infer_s, epochs_used)."""
+    t0 = time.perf_counter()
+    if model_type in CLASSICAL_MODEL_TYPES:
+        model = fit_classical(model_type, train_values, freq, train_timestamps)
+        t1 = time.perf_counter()
+        forecast = model.forecast(steps, future_timestamps(train_timestamps[-1], steps, freq))
+        return forecast, t1 - t0, time.perf_counter() - t1, None
+
+    data = with_exog(train_values, train_timestamps, freq) if exog else train_values
+    model, scaler, training = fit_keras_forecaster(data, model_type, LOOK_BACK, epochs)
+    t1 = time.perf_counter()
+    exog_future = future_exog_features(train_timestamps[-1], steps, freq) if exog else None
+    forecast = forecast_ahead(model, scaler, last_sequence_for(data, scaler), steps, exog_future=exog_future)
+    return forecast, t1 - t0, time.perf_counter() - t1, training.get("epochs_used")
+
+
+# ======================== Backtest ========================
+
+def backtest_series(
+    values: np.ndarray,
+    timestamps: List[datetime],
+    model_type: str,
+    granularity: str,
+    n_origins: int = 5,
+    stride: Optional[int] = None,
+    history: Optional[int] = None,
+    exog: bool = False,
+) -> Dict[str, Any]:
+    """
+    Rolling-origin backtest satu model_type untuk satu granularity.
+
+    Args:
+        values, timestamps: deret pada frekuensi granularity (hourly untuk daily,
+                            harian untuk weekly/monthly)
+        n_origins: jumlah origin (yang muat di deret)
+        exog: lstm/rnn dengan fitur kalender (tidak berlaku untuk model klasik)
+    """
+    steps, epochs = MULTIVARIATE_HORIZONS[granularity]
+    history = history or BACKTEST_HISTORY[granularity]
+    freq = _HISTORY_FREQ[granularity]
+    origins = rolling_origins(len(values), history, steps, n_origins, stride)
+    if not origins:
+        raise ValueError(
+            f"Deret terlalu pendek untuk backtest {granularity}: butuh >= {history + steps} titik, ada {len(values)}"
+        )
+
+    errors, train_s, infer_s, epochs_used, peaks, deltas = [], [], [], [], [], []
+    for origin in origins:
+        train_values = np.asarray(values[origin - history:origin], dtype=float)
+        actual = np.asarray(values[origin:origin + steps], dtype=float)
+        with _PeakRSS() as rss:
+            forecast, t_train, t_infer, used = _fit_and_forecast(
+                model_type, train_values, list(timestamps[origin - history:origin]), freq, steps, epochs, exog
+            )
+        errors.append(np.asarray(forecast, dtype=float) - actual)
+        train_s.append(t_train)
+        infer_s.append(t_infer)
+        peaks.append(rss.peak_mb)
+        deltas.append(rss.delta_mb)
+        if used is not None:
+            epochs_used.append(used)
+        gc.collect()  # model origin sebelumnya tidak ikut menaikkan RSS origin berikutnya
+
+    err = np.concatenate(errors)
+    return {
+        "model_type": model_type,
+        "exog": exog and model_type not in CLASSICAL_MODEL_TYPES,
+        "granularity": granularity,
+        "steps": steps,
+        "history": history,
+        "origins": len(origins),
+        "mae": float(np.mean(np.abs(err))),
+        "rmse": float(np.sqrt(np.mean(err * err))),
+        "train_s_mean": float(np.mean(train_s)),
+        "train_s_total": float(np.sum(train_s)),
+        "infer_ms_mean": float(np.mean(infer_s) * 1000.0),
+        "peak_rss_mb": float(max(peaks)),
+        "rss_delta_mb": float(max(deltas)),
+        "epochs_used_mean": float(np.mean(epochs_used)) if epochs_used else None,
+    }
+
+
+def run_backtest(
+    hourly_values: np.ndarray,
+    hourly_timestamps: List[datetime],
+    model_types: Sequence[str] = BACKTEST_MODEL_TYPES,
+    granularities: Sequence[str] = ("daily", "weekly", "monthly"),
+    n_origins: int = 5,
+    stride: Optional[int] = None,
+    exog: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Backtest semua kombinasi model_type x granularity dari satu deret hourly.
+    Kombinasi yang gagal (mis. deret terlalu pendek) dilaporkan dengan field "error".
+    exog=True: lstm/rnn dijalankan dua kali, tanpa dan dengan fitur kalender.
+    """
+    daily_values, daily_timestamps = aggregate_daily(hourly_values, hourly_timestamps)
+    results = []
+    for granularity in granularities:
+        if granularity == "daily":
+            values, timestamps = hourly_values, list(hourly_timestamps)
+        else:
+            values, timestamps = daily_values, daily_timestamps
+        for model_type in model_types:
+            variants = (False, True) if exog and model_type not in CLASSICAL_MODEL_TYPES else (False,)
+            for use_exog in variants:
+                try:
+                    results.append(backtest_series(
+                        values, timestamps, model_type, granularity, n_origins, stride, exog=use_exog
+                    ))
+                except ValueError as e:
+                    results.append({"model_type": model_type, "granularity": granularity, "error": str(e)})
+    return results
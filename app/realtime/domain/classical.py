@@ -0,0 +1,230 @@
+"""
+Forecaster klasik (pure NumPy) sebagai model_type alternatif LSTM/RNN.
+
+Models:
+- snaive       : seasonal naive (ulang nilai satu musim terakhir)
+- holt_winters : additive Holt-Winters dengan damped trend; alpha/beta/gamma
+                 dipilih dari grid yang dievaluasi sekaligus (vectorized per parameter)
+- ridge_ar     : ridge autoregressive dengan lag + fitur kalender
+                 (hour-of-day / weekday sin-cos dan flag jam kerja seperti generator.is_working)
+
+Season: 24 (hourly data, untuk forecast daily) atau 7 (daily data, untuk weekly/monthly).
+Fit dalam hitungan milidetik, tanpa TensorFlow/sklearn.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+
+from ..generator import WIB, WORK_HOURS
+
+CLASSICAL_MODEL_TYPES = ("snaive", "holt_winters", "ridge_ar")
+
+# Panjang musim dan step per frekuensi data historis
+SEASON_LENGTH = {"hourly": 24, "daily": 7}
+FREQ_STEP = {"hourly": timedelta(hours=1), "daily": timedelta(days=1)}
+
+# Grid parameter Holt-Winters (semua kombinasi dievaluasi dalam satu pass)
+HW_ALPHAS = (0.1, 0.3, 0.5, 0.8)
+HW_BETAS = (0.0, 0.05, 0.2)
+HW_GAMMAS = (0.05, 0.2, 0.5)
+HW_DAMPING = 0.98
+
+RIDGE_LAGS = 7
+RIDGE_LAMBDA = 1.0
+
+
+def calendar_features(timestamps: List[datetime], freq: str) -> np.ndarray:
+    """
+    Fitur kalender per timestamp bucket (WIB).
+
+    hourly: sin/cos hour-of-day (harmonik 1 & 2), flag jam kerja, flag weekend
+    daily : sin/cos weekday, flag hari kerja
+    """
+    weekday = np.array([ts.weekday() for ts in timestamps], dtype=float)
+    weekend = (weekday >= 5).astype(float)
+    if freq == "hourly":
+        hour = np.array([ts.hour for ts in timestamps], dtype=float)
+        angle = 2 * np.pi * hour / 24.0
+        working = (np.isin(hour, list(WORK_HOURS)) & (weekday < 5)).astype(float)
+        return np.column_stack([
+            np.sin(angle), np.cos(angle), np.sin(2 * angle), np.cos(2 * angle), working, weekend,
+        ])
+    angle = 2 * np.pi * weekday / 7.0
+    return np.column_stack([np.sin(angle), np.cos(angle), 1.0 - weekend])
+
+
+def infer_timestamps(n: int, freq: str) -> List[datetime]:
+    """Fallback jika caller tidak memberi timestamps: anggap data kontigu s/d bucket sekarang (WIB)."""
+    now = datetime.now(tz=WIB).replace(minute=0, second=0, microsecond=0)
+    if freq == "daily":
+        now = now.replace(hour=0)
+    step = FREQ_STEP[freq]
+    return [now - step * (n - 1 - i) for i in range(n)]
+
+
+def future_timestamps(last_timestamp: datetime, steps: int, freq: str) -> List[datetime]:
+    step = FREQ_STEP[freq]
+    return [last_timestamp + step * (i + 1) for i in range(steps)]
+
+
+class SeasonalNaive:
+    """Forecast = nilai pada musim terakhir yang diulang."""
+
+    def __init__(self, season: int):
+        self.season = season
+        self.last_season: Optional[np.ndarray] = None
+
+    def fit(self, values: np.ndarray, timestamps: Optional[List[datetime]] = None) -> "SeasonalNaive":
+        m = self.season if len(values) >= self.season else 1
+        self.last_season = np.asarray(values[-m:], dtype=float)
+        return self
+
+    def forecast(self, steps: int, future_ts: Optional[List[datetime]] = None) -> np.ndarray:
+        return self.last_season[np.arange(steps) % len(self.last_season)]
+
+    def get_weights(self) -> List[np.ndarray]:
+        return [self.last_season]
+
+
+class HoltWinters:
+    """Additive Holt-Winters, damped trend, parameter dipilih via SSE one-step in-sample."""
+
+    def __init__(self, season: int):
+        self.season = season
+        self.params = None
+        self.level = 0.0
+        self.trend = 0.0
+        self.seasonal: Optional[np.ndarray] = None
+        self.n = 0
+
+    def fit(self, values: np.ndarray, timestamps: Optional[List[datetime]] = None) -> "HoltWinters":
+        y = np.asarray(values, dtype=float)
+        n = len(y)
+        # Butuh minimal 2 musim untuk inisialisasi komponen musiman; jika kurang -> Holt (tanpa musim)
+        m = self.season if n >= 2 * self.season else 1
+
+        alpha, beta, gamma = (g.ravel() for g in np.meshgrid(HW_ALPHAS, HW_BETAS, HW_GAMMAS, indexing="ij"))
+        if m == 1:
+            gamma = np.zeros_like(gamma)
+        phi = HW_DAMPING
+
+        level0 = y[:m].mean()
+        trend0 = (y[m:2 * m].mean() - level0) / m if n >= 2 * m else 0.0
+        G = len(alpha)
+        L = np.full(G, level0)
+        T = np.full(G, trend0)
+        S = np.tile(y[:m] - level0 if m > 1 else np.zeros(1), (G, 1))
+        sse = np.zeros(G)
+
+        for t in range(n):
+            idx = t % m
+            s = S[:, idx]
+            err = y[t] - (L + phi * T + s)
+            sse += err * err
+            L_new = alpha * (y[t] - s) + (1 - alpha) * (L + phi * T)
+            T = beta * (L_new - L) + (1 - beta) * phi * T
+            S[:, idx] = gamma * (y[t] - L_new) + (1 - gamma) * s
+            L = L_new
+
+        best = int(np.argmin(sse))
+        self.params = (float(alpha[best]), float(beta[best]), float(gamma[best]))
+        self.level, self.trend = float(L[best]), float(T[best])
+        self.seasonal = S[best].copy()
+        self.n = n
+        return self
+
+    def forecast(self, steps: int, future_ts: Optional[List[datetime]] = None) -> np.ndarray:
+        h = np.arange(1, steps + 1)
+        damped = np.cumsum(HW_DAMPING ** h)
+        m = len(self.seasonal)
+        return self.level + damped * self.trend + self.seasonal[(self.n + h - 1) % m]
+
+    def get_weights(self) -> List[np.ndarray]:
+        return [self.seasonal, np.array([self.level, self.trend])]
+
+
+class RidgeAR:
+    """Ridge autoregressive: lag RIDGE_LAGS + fitur kalender, forecast rekursif."""
+
+    def __init__(self, freq: str, lags: int = RIDGE_LAGS, lam: float = RIDGE_LAMBDA):
+        self.freq = freq
+        self.lags = lags
+        self.lam = lam
+        self.coef: Optional[np.ndarray] = None
+        self.x_mean = self.x_std = None
+        self.y_mean = 0.0
+        self.history: Optional[np.ndarray] = None
+        self.last_timestamp: Optional[datetime] = None
+
+    def _design(self, lag_matrix: np.ndarray, cal: np.ndarray) -> np.ndarray:
+        return np.hstack([lag_matrix, cal])
+
+    def fit(self, values: np.ndarray, timestamps: List[datetime]) -> "RidgeAR":
+        y = np.asarray(values, dtype=float)
+        p = min(self.lags, len(y) - 1)
+        self.lags = p
+
+        # Row t (t = p..n-1): lag y[t-p..t-1] + kalender(t)
+        lag_matrix = np.lib.stride_tricks.sliding_window_view(y[:-1], p)
+        X = self._design(lag_matrix, calendar_features(timestamps[p:], self.freq))
+        target = y[p:]
+
+        self.x_mean = X.mean(axis=0)
+        self.x_std = X.std(axis=0)
+        self.x_std[self.x_std < 1e-8] = 1.0
+        Xs = (X - self.x_mean) / self.x_std
+        self.y_mean = float(target.mean())
+
+        A = Xs.T @ Xs + self.lam * np.eye(Xs.shape[1])
+        self.coef = np.linalg.solve(A, Xs.T @ (target - self.y_mean))
+        self.history = y[-p:].copy()
+        self.last_timestamp = timestamps[-1]
+        return self
+
+    def forecast(self, steps: int, future_ts: Optional[List[datetime]] = None) -> np.ndarray:
+        future_ts = future_ts or future_timestamps(self.last_timestamp, steps, self.freq)
+        cal = calendar_features(future_ts, self.freq)
+        window = list(self.history)
+        out = np.empty(steps)
+        for i in range(steps):
+            x = self._design(np.asarray(window[-self.lags:])[None, :], cal[i:i + 1])[0]
+            out[i] = self.y_mean + ((x - self.x_mean) / self.x_std) @ self.coef
+            window.append(out[i])
+        return out
+
+    def get_weights(self) -> List[np.ndarray]:
+        return [self.coef, self.x_mean, self.x_std]
+
+
+def fit_classical(
+    model_type: str,
+    values: np.ndarray,
+    freq: str,
+    timestamps: Optional[List[datetime]] = None,
+):
+    """
+    Fit forecaster klasik.
+
+    Args:
+        model_type: "snaive", "holt_winters", atau "ridge_ar"
+        values: 1D array historis
+        freq: "hourly" atau "daily" (frekuensi data historis)
+        timestamps: timestamp bucket per value (dipakai ridge_ar; jika None
+                    diasumsikan kontigu s/d bucket sekarang)
+    """
+    season = SEASON_LENGTH[freq]
+    if model_type == "snaive":
+        return SeasonalNaive(season).fit(values)
+    if model_type == "holt_winters":
+        return HoltWinters(season).fit(values)
+    if model_type == "ridge_ar":
+        if timestamps is None:
+            timestamps = infer_timestamps(len(values), freq)
+        if len(timestamps) != len(values):
+            raise ValueError("Jumlah timestamps harus sama dengan jumlah data points")
+        return RidgeAR(freq).fit(values, timestamps)
+    raise ValueError(f"model_type klasik tidak dikenal: {model_type}")
@@ -0,0 +1,90 @@
+"""
+Fitur exogenous untuk forecaster LSTM/RNN (settings.FORECAST_EXOGENOUS).
+
+Dengan LOOK_BACK = 7 model univariate harus menebak siklus harian dan pola jam kerja
+dari tujuh titik terakhir saja. Di sini setiap titik membawa konteks kalender yang juga
+diketahui untuk step masa depan, sehingga rollout autoregressive bisa memakainya:
+
+- hourly (forecast daily): sin/cos hour-of-day (harmonik 1 & 2), flag jam kerja
+  (generator.is_working), flag weekend, sin/cos weekday
+- daily (weekly/monthly): sin/cos weekday, flag hari kerja
+- energy_kwh: cooling degree max(0, temp - SETPOINT_C) / 10, penggerak beban AC di
+  generator. Temperatur masa depan belum diketahui, jadi diproyeksikan seasonal naive
+  (musim terakhir diulang, sama seperti model snaive)
+
+Semua fitur sudah berada di kisaran [-1, 1] / {0, 1} sehingga tidak butuh scaler; kolom 0
+matriks model tetap target yang dinormalisasi MinMaxScaler.
+Dihitung vectorized dari timestamp bucket (WIB) yang sama dengan deret historis.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from .classical import SEASON_LENGTH, calendar_features, future_timestamps
+
+# Metric yang memakai temperatur sebagai input tambahan
+TEMPERATURE_DRIVEN_METRICS = ("energy_kwh",)
+COOLING_DEGREE_SCALE = 10.0
+
+
+def cooling_degree(temperature: np.ndarray) -> np.ndarray:
+    return np.maximum(0.0, np.asarray(temperature, dtype=float) - settings.SETPOINT_C) / COOLING_DEGREE_SCALE
+
+
+def project_seasonal(history: np.ndarray, steps: int, freq: str) -> np.ndarray:
+    """Proyeksi seasonal naive: musim terakhir (24 jam / 7 hari) diulang sepanjang `steps`."""
+    history = np.asarray(history, dtype=float)
+    season = min(SEASON_LENGTH[freq], len(history))
+    return np.resize(history[-season:], steps)
+
+
+def exog_features(
+    timestamps: List[datetime],
+    freq: str,
+    temperature: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Matriks fitur exogenous (n, k) per timestamp bucket.
+
+    Args:
+        freq: "hourly" atau "daily"
+        temperature: temperatur per bucket (hanya untuk metric energy), sejajar timestamps
+    """
+    columns = [calendar_features(timestamps, freq)]
+    if freq == "hourly":
+        angle = 2 * np.pi * np.array([ts.weekday() for ts in timestamps], dtype=float) / 7.0
+        columns.append(np.column_stack([np.sin(angle), np.cos(angle)]))
+    if temperature is not None:
+        columns.append(cooling_degree(temperature)[:, None])
+    return np.hstack(columns)
+
+
+def future_exog_features(
+    last_timestamp: datetime,
+    steps: int,
+    freq: str,
+    temperature_history: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Fitur exogenous untuk `steps` bucket setelah last_timestamp, shape (steps, k)."""
+    temperature = None
+    if temperature_history is not None:
+        temperature = project_seasonal(temperature_history, steps, freq)
+    return exog_features(future_timestamps(last_timestamp, steps, freq), freq, temperature)
+
+
+def with_exog(
+    values: np.ndarray,
+    timestamps: List[datetime],
+    freq: str,
+    temperature: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Matriks input model (n, 1 + k): kolom 0 = target (skala asli), sisanya fitur exogenous."""
+    values = np.asarray(values, dtype=float).reshape(-1)
+    if len(timestamps) != len(values):
+        raise ValueError("timestamps harus sejajar dengan values")
+    return np.column_stack([values, exog_features(timestamps, freq, temperature)])
@@ -4,35 +4,61 @@ Menggunakan LSTM dan SimpleRNN yang dioptimasi untuk CPU (stateless, layer minim
 
 Data source: sensor_hourly (real monitoring data)
 Automatic update: Model dilatih ulang setiap data baru tersedia
-Persistence: Model disimpan ke disk dan di-load ulang
+Persistence: Model disimpan ke ModelStore (content-addressed, atomik, file lock per key)
+             di settings.FORECAST_STORE_DIR, dipakai bersama oleh semua worker
+Serving: model di-load dari export inference-only .npz (numpy_infer.py, default) atau
+         .tflite (backend "tflite", lihat tflite_infer.py); .h5 hanya untuk fallback
+Cache: Model yang sudah di-load disimpan di in-memory LRU cache per worker
+Templates: training, fine-tune dan backend "keras" meminjam model Keras ter-compile per
+           arsitektur dari ModelTemplatePool (graph dipakai ulang, hanya weights ditukar)
+Training: dijalankan di TrainingExecutor terbatas (bukan threadpool request) dengan
+          jumlah thread TensorFlow yang dibatasi, agar serving tetap responsif
 
 Catatan:
-- Models: SimpleLSTM (1 layer LSTM ringan) dan SimpleRNN
+- Models: SimpleLSTM (1 layer LSTM ringan) dan SimpleRNN, plus forecaster klasik
+  NumPy (snaive, holt_winters, ridge_ar; lihat classical.py) untuk kurva cepat tanpa training Keras
 - Input: time-series historis dari database (hourly data aggregated)
 - Output: forecast untuk N jam/hari/bulan ke depan
 - Optimization: stateless, kecil ukuran, cepat inference
 - Data update: Otomatis dari database setiap forecast request
+- Import: TensorFlow/Keras dan sklearn di-import lazy (saat training/inference pertama),
+  sehingga startup worker dan endpoint non-forecast tidak membayar biaya import-nya
 """
 
+from __future__ import annotations
+
 import numpy as np
 from datetime import datetime, timedelta
 import pickle
-import os
-import json
 import hashlib
-from typing import Dict, List, Tuple, Optional
+import io
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Literal, Tuple, Optional
+
+from app.core.config import settings
+from .classical import CLASSICAL_MODEL_TYPES, fit_classical, future_timestamps
+from .exogenous import TEMPERATURE_DRIVEN_METRICS, future_exog_features, with_exog
+from .model_cache import ModelLRUCache, estimate_model_bytes
+from .model_pool import ModelTemplatePool
+from .model_store import ModelStore
+from .numpy_infer import NumpyForecaster, export_npz, load_npz_scaler
+from .retrain_policy import ForecastErrorLog, ModelState, RetrainPolicy, get_retrain_policy
+from .tflite_infer import TFLiteForecaster, export_tflite
+from .training_executor import TrainingExecutor, TrainingQueueFull
 
-# TensorFlow/Keras dengan optimasi CPU
-import tensorflow as tf
-from tensorflow.keras import Sequential
-from tensorflow.keras.layers import LSTM, SimpleRNN, Dense, Dropout
-from tensorflow.keras.optimizers import Adam
-from sklearn.preprocessing import MinMaxScaler
+if TYPE_CHECKING:
+    from tensorflow.keras import Sequential
+    from sklearn.preprocessing import MinMaxScaler
 
 
 # ======================== Config ========================
-FORECAST_CACHE_DIR = "/tmp/bima_forecast_models"
-os.makedirs(FORECAST_CACHE_DIR, exist_ok=True)
+ModelType = Literal["lstm", "rnn", "auto", "snaive", "holt_winters", "ridge_ar"]
 
 # Model hyperparameter (ringan untuk CPU)
 LSTM_UNITS = 32  # Small for CPU
@@ -41,8 +67,75 @@ DROPOUT_RATE = 0.1
 LOOK_BACK = 7  # 7 step lookback (jam/hari)
 BATCH_SIZE = 16
 
-# Cache metadata untuk tracking updates
-CACHE_METADATA_PATH = os.path.join(FORECAST_CACHE_DIR, "metadata.json")
+# Versi format cache; naikkan jika arsitektur/feature berubah agar warm-start tidak dipakai
+CACHE_SCHEMA_VERSION = 1
+# Toleransi drift: nilai baru boleh keluar dari range scaler maksimal 10% dari range
+DRIFT_RANGE_TOLERANCE = 0.1
+# Early stopping hanya dipakai jika window validasi cukup; perbaikan val_loss < min_delta dianggap plateau
+MIN_VALIDATION_WINDOWS = 4
+EARLY_STOPPING_MIN_DELTA = 1e-4
+# Setelah early stopping: epoch tambahan atas semua window (termasuk ekor validasi) dari weights terbaik
+TAIL_PASS_EPOCHS = 1
+
+# Disk store bersama (manifest per key + blob content-addressed)
+_STORE = ModelStore(settings.FORECAST_STORE_DIR)
+
+# Log forecast + error terealisasi per cache key (input retrain policy "drift"), di state store
+_ERROR_LOG = ForecastErrorLog(_STORE)
+
+# In-memory LRU cache: request hangat tidak perlu disk I/O / rebuild graph
+_MODEL_CACHE = ModelLRUCache(
+    max_entries=settings.FORECAST_MODEL_CACHE_SIZE,
+    max_bytes=settings.FORECAST_MODEL_CACHE_MAX_MB * 1024 * 1024,
+)
+
+# Semua training (sinkron untuk request, retrain background, precompute) lewat executor ini
+_TRAIN_EXECUTOR = TrainingExecutor(
+    max_workers=settings.FORECAST_TRAIN_WORKERS,
+    max_queue=settings.FORECAST_TRAIN_QUEUE_SIZE,
+)
+
+# Stale-while-revalidate: model terakhir yang valid per (granularity, metric, model_type);
+# retrain saat data berubah dijadwalkan ke _TRAIN_EXECUTOR
+_LAST_GOOD: Dict[Tuple[str, str, str], Tuple[Sequential, MinMaxScaler]] = {}
+_LAST_GOOD_LOCK = threading.Lock()
+
+# Jumlah keputusan retrain policy per alasan (stale, error_drift, within_budget, ...)
+_RETRAIN_DECISIONS: Dict[str, int] = {}
+_RETRAIN_DECISIONS_LOCK = threading.Lock()
+
+
+# ======================== Lazy Imports ========================
+
+_TF_THREADS_LOCK = threading.Lock()
+_TF_THREADS_CONFIGURED = False
+
+
+def _tf():
+    """
+    Import TensorFlow saat pertama dibutuhkan (training / inference Keras).
+    Pada import pertama, batasi thread intra-op / inter-op TensorFlow sesuai settings
+    (harus sebelum op pertama dijalankan).
+    """
+    global _TF_THREADS_CONFIGURED
+    import tensorflow as tf
+    if not _TF_THREADS_CONFIGURED:
+        with _TF_THREADS_LOCK:
+            if not _TF_THREADS_CONFIGURED:
+                try:
+                    if settings.FORECAST_TF_INTRA_OP_THREADS > 0:
+                        tf.config.threading.set_intra_op_parallelism_threads(settings.FORECAST_TF_INTRA_OP_THREADS)
+                    if settings.FORECAST_TF_INTER_OP_THREADS > 0:
+                        tf.config.threading.set_inter_op_parallelism_threads(settings.FORECAST_TF_INTER_OP_THREADS)
+                except RuntimeError as e:  # context TF sudah terinisialisasi di tempat lain
+                    logging.warning("[forecast] thread TensorFlow tidak bisa diatur: %s", e)
+                _TF_THREADS_CONFIGURED = True
+    return tf
+
+
+def _min_max_scaler(**kwargs) -> MinMaxScaler:
+    from sklearn.preprocessing import MinMaxScaler
+    return MinMaxScaler(**kwargs)
 
 
 # ======================== Cache Management ========================
@@ -52,6 +145,39 @@ def _get_data_hash(data: np.ndarray) -> str:
     return hashlib.md5(data.tobytes()).hexdigest()
 
 
+def get_model_cache_stats() -> Dict[str, any]:
+    """Statistik in-memory model cache (hits, misses, evictions, bytes)."""
+    return _MODEL_CACHE.stats()
+
+
+def get_training_stats() -> Dict[str, any]:
+    """
+    Statistik executor training (pending, rejected karena antrean penuh, coalesced, dst)
+    + keputusan retrain policy per alasan.
+    """
+    with _RETRAIN_DECISIONS_LOCK:
+        decisions = dict(_RETRAIN_DECISIONS)
+    return {
+        **_TRAIN_EXECUTOR.stats(),
+        "retrain_policy": settings.FORECAST_RETRAIN_POLICY,
+        "retrain_decisions": decisions,
+    }
+
+
+def get_template_pool_stats() -> Dict[str, any]:
+    """Statistik pool template model Keras (template idle, build baru, hits)."""
+    return _TEMPLATE_POOL.stats()
+
+
+def _train_job_key(model_type: str, granularity: str, metric: str, data_hash: str) -> Tuple[str, ...]:
+    """Key single-flight training: request bersamaan untuk model + data yang sama = satu job."""
+    return ("train", granularity, metric, model_type, data_hash)
+
+
+def _cache_key(model_type: str, granularity: str, metric: str) -> str:
+    return f"{granularity}_{metric}_{model_type}"
+
+
 def _save_model_cache(
     model_type: str,
     granularity: str,
@@ -60,72 +186,112 @@ def _save_model_cache(
     scaler: MinMaxScaler,
     data_hash: str,
     data_length: int,
+    series: Optional[np.ndarray] = None,
+    look_back: int = LOOK_BACK,
+    train_mode: str = "full",
+    incremental_updates: int = 0,
+    training: Optional[Dict[str, Any]] = None,
 ):
-    """Simpan model dan metadata ke disk."""
-    cache_key = f"{granularity}_{metric}_{model_type}"
-    model_path = os.path.join(FORECAST_CACHE_DIR, f"{cache_key}_model.h5")
-    scaler_path = os.path.join(FORECAST_CACHE_DIR, f"{cache_key}_scaler.pkl")
+    """
+    Simpan model, scaler, deret training (untuk warm-start) dan manifest ke store.
+    Caller memegang _STORE.lock(cache_key) (lihat train_forecast_model).
+    `training`: ringkasan fit (epochs_used, epochs_budget, stopped_by, ...) dari _fit_with_budget.
+    """
+    cache_key = _cache_key(model_type, granularity, metric)
+    files = {}
     
-    # Simpan model
-    model.save(model_path, save_format='h5')
+    # Model Keras (.h5, tanpa optimizer state) + export inference-only: weights .npz
+    # (backend numpy / keras, fine-tune, MC dropout) dan .tflite (hanya untuk backend tflite:
+    # konversi TFLite ~0.5 s per simpan, sia-sia jika tidak pernah di-serve)
+    with _as_keras(model) as keras_model:
+        tmp_h5 = _STORE.tmp_path(".h5")
+        keras_model.save(tmp_h5, include_optimizer=False)
+        files["model"] = _STORE.put_file(tmp_h5, ".h5")
+        tmp_npz = _STORE.tmp_path(".npz")
+        export_npz(keras_model, scaler, tmp_npz)
+        files["npz"] = _STORE.put_file(tmp_npz, ".npz")
+        quantization = settings.FORECAST_TFLITE_QUANTIZATION
+        if settings.FORECAST_SERVING_BACKEND == "tflite" and quantization != "off":
+            tmp_tflite = _STORE.tmp_path(".tflite")
+            try:
+                export_tflite(keras_model, tmp_tflite, quantization)
+                files["tflite"] = _STORE.put_file(tmp_tflite, ".tflite")
+            except Exception as e:
+                # Serving tetap jalan lewat .npz
+                logging.warning("[forecast] Export TFLite %s gagal: %s", cache_key, e)
+                if os.path.exists(tmp_tflite):
+                    os.remove(tmp_tflite)
     
-    # Simpan scaler
-    with open(scaler_path, 'wb') as f:
-        pickle.dump(scaler, f)
+    files["scaler"] = _STORE.put_bytes(pickle.dumps(scaler), ".pkl")
     
-    # Update metadata
-    metadata = {}
-    if os.path.exists(CACHE_METADATA_PATH):
-        with open(CACHE_METADATA_PATH, 'r') as f:
-            metadata = json.load(f)
+    # Deret training (dipakai untuk deteksi data yang hanya bertambah di ujung)
+    if series is not None:
+        buf = io.BytesIO()
+        np.save(buf, np.asarray(series, dtype=float))
+        files["series"] = _STORE.put_bytes(buf.getvalue(), ".npy")
     
-    metadata[cache_key] = {
+    _STORE.write_manifest(cache_key, {
         "data_hash": data_hash,
         "data_length": data_length,
         "trained_at": datetime.now(tz=None).isoformat(),
         "model_type": model_type,
         "granularity": granularity,
         "metric": metric,
-    }
+        "look_back": look_back,
+        "schema_version": CACHE_SCHEMA_VERSION,
+        "train_mode": train_mode,
+        "incremental_updates": incremental_updates,
+        **(training or {}),
+        "files": files,
+    })
     
-    with open(CACHE_METADATA_PATH, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    try:
+        _STORE.collect_garbage()
+    except OSError as e:
+        logging.warning("[forecast] GC model store gagal: %s", e)
 
 
 def _load_model_cache(
     model_type: str,
     granularity: str,
     metric: str,
-    data_hash: str,
+    data_hash: Optional[str],
+    for_serving: bool = True,
 ) -> Optional[Tuple[Sequential, MinMaxScaler]]:
-    """Load model dari cache jika ada dan data_hash cocok."""
-    if not os.path.exists(CACHE_METADATA_PATH):
-        return None
-    
-    with open(CACHE_METADATA_PATH, 'r') as f:
-        metadata = json.load(f)
-    
-    cache_key = f"{granularity}_{metric}_{model_type}"
-    if cache_key not in metadata:
+    """
+    Load model dari store jika ada dan data_hash cocok.
+    data_hash=None: load model terakhir apa pun hash-nya (untuk stale serving).
+    for_serving=True + FORECAST_SERVING_BACKEND="tflite": load .tflite sebagai TFLiteForecaster.
+    for_serving=True + FORECAST_SERVING_BACKEND="numpy": load .npz sebagai NumpyForecaster.
+    for_serving=False / backend "keras": weights .npz sebagai PooledForecaster (template
+    ter-compile, dibutuhkan untuk fine-tune); model lama tanpa .npz di-load dari .h5.
+    """
+    manifest = _STORE.read_manifest(_cache_key(model_type, granularity, metric))
+    if manifest is None:
         return None
     
     # Check if data hash matches (data belum berubah)
-    if metadata[cache_key].get("data_hash") != data_hash:
+    if data_hash is not None and manifest.get("data_hash") != data_hash:
         return None
     
+    files = manifest.get("files", {})
     try:
-        cache_key = f"{granularity}_{metric}_{model_type}"
-        model_path = os.path.join(FORECAST_CACHE_DIR, f"{cache_key}_model.h5")
-        scaler_path = os.path.join(FORECAST_CACHE_DIR, f"{cache_key}_scaler.pkl")
+        backend = settings.FORECAST_SERVING_BACKEND if for_serving else "keras"
+        if backend == "tflite" and "tflite" in files and "npz" in files:
+            npz_path = _STORE.blob_path(files["npz"])
+            return TFLiteForecaster.load(_STORE.blob_path(files["tflite"]), npz_path), load_npz_scaler(npz_path)
+        if backend == "numpy" and "npz" in files:
+            return NumpyForecaster.load(_STORE.blob_path(files["npz"]))
         
-        if not os.path.exists(model_path) or not os.path.exists(scaler_path):
-            return None
-        
-        # Load model
-        model = tf.keras.models.load_model(model_path)
+        # Weights ke template pool: tanpa load_model + build/trace graph baru per model
+        if "npz" in files:
+            engine, _ = NumpyForecaster.load(_STORE.blob_path(files["npz"]))
+            model = PooledForecaster.from_numpy(engine)
+        else:
+            model = _tf().keras.models.load_model(_STORE.blob_path(files["model"]), compile=False)
         
         # Load scaler
-        with open(scaler_path, 'rb') as f:
+        with open(_STORE.blob_path(files["scaler"]), 'rb') as f:
             scaler = pickle.load(f)
         
         return model, scaler
@@ -133,29 +299,132 @@ def _load_model_cache(
         return None
 
 
+def _remember_last_good(model_type: str, granularity: str, metric: str, cached: Tuple[Sequential, MinMaxScaler]):
+    with _LAST_GOOD_LOCK:
+        _LAST_GOOD[(granularity, metric, model_type)] = cached
+
+
+def _get_cached_model(
+    model_type: str,
+    granularity: str,
+    metric: str,
+    data_hash: str,
+) -> Optional[Tuple[Sequential, MinMaxScaler]]:
+    """Cari model untuk data_hash ini: memory -> disk."""
+    memory_key = (granularity, metric, model_type, data_hash)
+    cached = _MODEL_CACHE.get(memory_key)
+    if cached is None:
+        cached = _load_model_cache(model_type, granularity, metric, data_hash)
+        if cached is not None:
+            _MODEL_CACHE.put(memory_key, cached, estimate_model_bytes(cached[0]))
+    if cached is not None:
+        _remember_last_good(model_type, granularity, metric, cached)
+    return cached
+
+
+def _get_last_good_model(
+    model_type: str,
+    granularity: str,
+    metric: str,
+) -> Optional[Tuple[Sequential, MinMaxScaler]]:
+    """Model terakhir yang valid (boleh dilatih dari data lama): memory -> disk."""
+    with _LAST_GOOD_LOCK:
+        cached = _LAST_GOOD.get((granularity, metric, model_type))
+    if cached is None:
+        cached = _load_model_cache(model_type, granularity, metric, data_hash=None)
+        if cached is not None:
+            _remember_last_good(model_type, granularity, metric, cached)
+    return cached
+
+
 # ======================== Data Preparation ========================
 
 def prepare_timeseries(values: np.ndarray, look_back: int = LOOK_BACK) -> Tuple[np.ndarray, np.ndarray]:
     """
     Prepare time-series data untuk supervised learning.
+    Zero-copy: X adalah sliding-window view (read-only) ke buffer `values`, bukan salinan.
     
     Args:
-        values: 1D array dari values
+        values: 1D array, atau 2D (timesteps, channels) untuk multivariate
         look_back: number of previous timesteps to use as variables
         
     Returns:
-        (X, y) dimana X shape (n_samples, look_back) dan y shape (n_samples,)
+        (X, y) dimana X shape (n_samples, look_back) dan y shape (n_samples,);
+        untuk 2D: X (n_samples, look_back, channels) dan y (n_samples, channels)
+    """
+    if len(values) <= look_back:
+        return np.empty((0, look_back) + values.shape[1:]), np.empty((0,) + values.shape[1:])
+    windows = np.lib.stride_tricks.sliding_window_view(values[:-1], look_back, axis=0)
+    if values.ndim == 2:
+        windows = windows.transpose(0, 2, 1)  # (n, channels, look_back) -> (n, look_back, channels)
+    return windows, values[look_back:]
+
+
+def make_training_dataset(
+    normalized: np.ndarray,
+    look_back: int = LOOK_BACK,
+    batch_size: int = BATCH_SIZE,
+    shuffle: bool = True,
+    indices: Optional[np.ndarray] = None,
+    n_targets: Optional[int] = None,
+):
+    """
+    tf.data pipeline (X, y) batched dari satu buffer normalized.
+    Window di-gather per batch dari buffer yang sama (tidak ada matriks X salinan
+    di memori); urutan window diacak tiap epoch seperti model.fit(shuffle=True).
+    
+    Args:
+        normalized: 1D atau 2D (timesteps, channels), sudah dinormalisasi dengan scaler training
+        indices: index awal window yang dipakai (default semua), mis. split train/validasi
+        n_targets: jumlah channel pertama yang jadi target y (default semua; model exogenous = 1)
+        
+    Returns:
+        tf.data.Dataset dengan X (batch, look_back, channels) dan y (batch, n_targets)
+    """
+    tf = _tf()
+    buffer = np.asarray(normalized, dtype=np.float32).reshape(len(normalized), -1)
+    n_windows = len(buffer) - look_back
+    if n_windows <= 0:
+        raise ValueError(f"Data harus lebih dari {look_back} data points")
+
+    series = tf.constant(buffer)
+    offsets = tf.range(look_back, dtype=tf.int64)
+
+    def gather_windows(idx):
+        X = tf.gather(series, idx[:, None] + offsets[None, :])
+        y = tf.gather(series, idx + look_back)
+        return X, y[:, :n_targets]
+
+    if indices is None:
+        ds = tf.data.Dataset.range(n_windows)
+    else:
+        ds = tf.data.Dataset.from_tensor_slices(np.asarray(indices, dtype=np.int64))
+    if shuffle:
+        ds = ds.shuffle(n_windows, reshuffle_each_iteration=True)
+    return (
+        ds.batch(batch_size)
+        .map(gather_windows, num_parallel_calls=tf.data.AUTOTUNE)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+
+def split_validation_windows(n_windows: int, fraction: float) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Split index window menjadi (train, validasi): `fraction` window terakhir (ekor kontigu) jadi
+    validasi. Window validasi yang diselang-seling dengan window training berbagi look_back - 1
+    titik input dengan tetangganya, sehingga val_loss terlalu optimis dan early stopping berhenti
+    pada data yang bocor. Validasi None jika window-nya kurang dari MIN_VALIDATION_WINDOWS.
     """
-    X, y = [], []
-    for i in range(len(values) - look_back):
-        X.append(values[i:i + look_back])
-        y.append(values[i + look_back])
-    return np.array(X), np.array(y)
+    all_idx = np.arange(n_windows)
+    n_val = int(round(n_windows * fraction))
+    if n_val < MIN_VALIDATION_WINDOWS:
+        return all_idx, None
+    return all_idx[:-n_val], all_idx[-n_val:]
 
 
 def normalize_data(data: np.ndarray) -> Tuple[np.ndarray, MinMaxScaler]:
     """Normalize data menggunakan MinMaxScaler."""
-    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaler = _min_max_scaler(feature_range=(0, 1))
     normalized = scaler.fit_transform(data.reshape(-1, 1)).flatten()
     return normalized, scaler
 
@@ -167,38 +436,460 @@ def denormalize_data(normalized_data: np.ndarray, scaler: MinMaxScaler) -> np.nd
 
 # ======================== Model Building ========================
 
-def build_lstm_model(look_back: int = LOOK_BACK) -> Sequential:
+def build_lstm_model(look_back: int = LOOK_BACK, n_features: int = 1) -> Sequential:
     """
     Build lightweight LSTM model untuk CPU.
     Single layer LSTM dengan dropout untuk regularisasi.
+    n_features > 1: channel 0 target, sisanya fitur exogenous (output tetap 1).
     """
-    model = Sequential([
-        LSTM(units=LSTM_UNITS, input_shape=(look_back, 1), return_sequences=False),
-        Dropout(DROPOUT_RATE),
-        Dense(units=16, activation="relu"),
-        Dense(units=1)
+    keras = _tf().keras
+    model = keras.Sequential([
+        keras.layers.LSTM(units=LSTM_UNITS, input_shape=(look_back, n_features), return_sequences=False),
+        keras.layers.Dropout(DROPOUT_RATE),
+        keras.layers.Dense(units=16, activation="relu"),
+        keras.layers.Dense(units=1)
     ])
-    model.compile(optimizer=Adam(learning_rate=0.001), loss="mse")
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate=0.001), loss="mse")
     return model
 
 
-def build_rnn_model(look_back: int = LOOK_BACK) -> Sequential:
+def build_rnn_model(look_back: int = LOOK_BACK, n_features: int = 1) -> Sequential:
     """
     Build lightweight SimpleRNN model untuk CPU.
     Single layer RNN dengan dropout.
+    n_features > 1: channel 0 target, sisanya fitur exogenous (output tetap 1).
     """
-    model = Sequential([
-        SimpleRNN(units=RNN_UNITS, input_shape=(look_back, 1), return_sequences=False),
-        Dropout(DROPOUT_RATE),
-        Dense(units=16, activation="relu"),
-        Dense(units=1)
+    keras = _tf().keras
+    model = keras.Sequential([
+        keras.layers.SimpleRNN(units=RNN_UNITS, input_shape=(look_back, n_features), return_sequences=False),
+        keras.layers.Dropout(DROPOUT_RATE),
+        keras.layers.Dense(units=16, activation="relu"),
+        keras.layers.Dense(units=1)
     ])
-    model.compile(optimizer=Adam(learning_rate=0.001), loss="mse")
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate=0.001), loss="mse")
     return model
 
 
+# ======================== Model Templates ========================
+
+# Nama class layer recurrent Keras -> model_type
+_RECURRENT_TYPES = {"LSTM": "lstm", "SimpleRNN": "rnn"}
+
+
+def _build_template(key: Tuple[str, int, int, int]) -> Sequential:
+    """Builder _TEMPLATE_POOL; key = (model_type, look_back, n_features, n_outputs)."""
+    model_type, look_back, n_features, n_outputs = key
+    if n_outputs > 1:
+        return build_multivariate_model(n_outputs, model_type, look_back)
+    if model_type == "lstm":
+        return build_lstm_model(look_back, n_features)
+    if model_type == "rnn":
+        return build_rnn_model(look_back, n_features)
+    raise ValueError("model_type harus 'lstm' atau 'rnn'")
+
+
+# Model Keras ter-compile per arsitektur, dipakai bergantian oleh semua model dengan bentuk sama:
+# train step dan rollout tf.function cukup di-trace sekali per template, bukan per model
+_TEMPLATE_POOL = ModelTemplatePool(_build_template, max_idle=settings.FORECAST_TEMPLATE_POOL_IDLE)
+
+
+class PooledForecaster:
+    """
+    Model LSTM/RNN sebagai weights NumPy + key arsitektur. Rollout, MC dropout, fine-tune dan
+    export meminjam template dari _TEMPLATE_POOL dan memasang weights ini (set_weights ~ms),
+    jadi banyak model di cache tidak masing-masing memegang graph Keras + tf.function sendiri.
+    API inference sama dengan NumpyForecaster / TFLiteForecaster.
+    """
+
+    def __init__(self, key: Tuple[str, int, int, int], weights: List[np.ndarray]):
+        self.key = key
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.input_shape = (None, key[1], key[2])
+        self.n_outputs = key[3]
+
+    @classmethod
+    def from_keras(cls, model: Sequential) -> "PooledForecaster":
+        key = (
+            _RECURRENT_TYPES[type(model.layers[0]).__name__],
+            int(model.input_shape[1]),
+            int(model.input_shape[2]),
+            int(model.output_shape[-1]),
+        )
+        return cls(key, model.get_weights())
+
+    @classmethod
+    def from_numpy(cls, engine: NumpyForecaster) -> "PooledForecaster":
+        key = (
+            _RECURRENT_TYPES[engine.layers[0]["type"]],
+            int(engine.input_shape[1]),
+            int(engine.input_shape[2]),
+            engine.n_outputs,
+        )
+        return cls(key, engine.get_weights())
+
+    @contextmanager
+    def keras(self):
+        """Pinjam template dengan weights model ini; dikembalikan ke pool setelah blok `with`."""
+        with _TEMPLATE_POOL.acquire(self.key) as model:
+            model.set_weights(self.weights)
+            yield model
+
+    def rollout(self, last_sequence: np.ndarray, steps: int, exog: Optional[np.ndarray] = None) -> np.ndarray:
+        with self.keras() as model:
+            return _rollout_keras(model, last_sequence, steps, exog)
+
+    def rollout_samples(
+        self,
+        last_sequence: np.ndarray,
+        steps: int,
+        n_samples: int,
+        rng=None,
+        exog: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        # rng tidak dipakai: mask dropout dibuat TensorFlow di dalam graph
+        with self.keras() as model:
+            return _mc_samples_keras(model, last_sequence, steps, n_samples, exog)
+
+    def get_weights(self) -> List[np.ndarray]:
+        return self.weights
+
+
+def _as_keras(model):
+    """Context manager -> model Keras: template pinjaman untuk PooledForecaster, atau model itu sendiri."""
+    if isinstance(model, PooledForecaster):
+        return model.keras()
+    return nullcontext(model)
+
+
 # ======================== Training ========================
 
+def _find_appended_start(prev: np.ndarray, data: np.ndarray, max_shift: int) -> Optional[int]:
+    """
+    Cek apakah `data` = `prev` yang digeser `shift` step + titik baru di ujung
+    (window historis yang maju 1 jam/hari). Titik terakhir `prev` boleh berubah
+    karena bucket berjalan (mis. rata-rata hari ini) masih diagregasi ulang.
+    
+    Returns:
+        index pertama di `data` yang baru/berubah, atau None jika bukan pola append
+    """
+    n_prev = len(prev)
+    for shift in range(max_shift + 1):
+        overlap = n_prev - shift - 1
+        if overlap < 1 or overlap >= len(data):
+            continue
+        if np.allclose(data[:overlap], prev[shift:shift + overlap]):
+            return overlap
+    return None
+
+
+def _fine_tune(model: Sequential, X: np.ndarray, y: np.ndarray, epochs: int) -> None:
+    """
+    Fine-tune eager dengan GradientTape. Untuk beberapa window saja ini jauh lebih
+    murah daripada model.fit, yang men-trace ulang train function setiap model baru.
+    """
+    tf = _tf()
+    optimizer = tf.keras.optimizers.Adam(learning_rate=0.001)
+    X = tf.constant(X, dtype=tf.float32)
+    y = tf.constant(y.reshape(-1, 1), dtype=tf.float32)
+    for _ in range(epochs):
+        for start in range(0, len(X), BATCH_SIZE):
+            xb, yb = X[start:start + BATCH_SIZE], y[start:start + BATCH_SIZE]
+            with tf.GradientTape() as tape:
+                loss = tf.reduce_mean(tf.square(model(xb, training=True) - yb))
+            grads = tape.gradient(loss, model.trainable_variables)
+            optimizer.apply_gradients(zip(grads, model.trainable_variables))
+
+
+def _time_budget_callback(budget_s: float):
+    """Keras callback yang menghentikan fit setelah `budget_s` detik (dicek per batch)."""
+    keras = _tf().keras
+
+    class TimeBudget(keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.deadline = None
+            self.exhausted = False
+
+        def on_train_begin(self, logs=None):
+            self.deadline = time.monotonic() + budget_s
+
+        def on_train_batch_end(self, batch, logs=None):
+            if time.monotonic() >= self.deadline:
+                self.exhausted = True
+                self.model.stop_training = True
+
+    return TimeBudget()
+
+
+def _fit_with_budget(
+    model: Sequential,
+    normalized: np.ndarray,
+    look_back: int,
+    epochs: int,
+    verbose: int = 0,
+) -> Dict[str, Any]:
+    """
+    Full fit dengan early stopping (val_loss, restore best weights) dan batas wall-clock.
+    `epochs` adalah batas atas; kebanyakan deret konvergen jauh sebelum itu.
+    Weights terbaik dipulihkan baik saat early stopping maupun saat budget waktu habis, lalu
+    TAIL_PASS_EPOCHS epoch dilatih atas semua window agar ekor validasi (data terbaru) ikut
+    dipelajari model yang disimpan.
+    
+    Returns:
+        ringkasan untuk manifest: epochs_used, epochs_budget, stopped_by
+        ("early_stopping" / "time_budget" / "max_epochs"), train_seconds, val_loss
+        (sebelum tail pass; skor pemilihan model_type=auto) (+ tail_pass_epochs jika ada validasi)
+    """
+    keras = _tf().keras
+    n_windows = len(normalized) - look_back
+    n_targets = int(model.output_shape[-1])
+    train_idx, val_idx = np.arange(n_windows), None
+    if settings.FORECAST_EARLY_STOPPING:
+        train_idx, val_idx = split_validation_windows(n_windows, settings.FORECAST_VALIDATION_FRACTION)
+    
+    dataset = make_training_dataset(normalized, look_back, indices=train_idx, n_targets=n_targets)
+    callbacks = []
+    val_dataset = early_stop = budget = None
+    if val_idx is not None:
+        val_dataset = make_training_dataset(
+            normalized, look_back, shuffle=False, indices=val_idx, n_targets=n_targets
+        )
+        early_stop = keras.callbacks.EarlyStopping(
+            monitor="val_loss",
+            patience=settings.FORECAST_EARLY_STOPPING_PATIENCE,
+            min_delta=EARLY_STOPPING_MIN_DELTA,
+            restore_best_weights=True,
+        )
+        callbacks.append(early_stop)
+    if settings.FORECAST_TRAIN_TIME_BUDGET_S > 0:
+        budget = _time_budget_callback(settings.FORECAST_TRAIN_TIME_BUDGET_S)
+        callbacks.append(budget)
+    
+    t0 = time.perf_counter()
+    history = model.fit(
+        dataset,
+        validation_data=val_dataset,
+        epochs=epochs,
+        verbose=verbose,
+        shuffle=False,  # dataset sudah diacak per epoch
+        callbacks=callbacks,
+    )
+    
+    epochs_used = len(history.history.get("loss", []))
+    if budget is not None and budget.exhausted:
+        stopped_by = "time_budget"
+    elif early_stop is not None and early_stop.stopped_epoch > 0:
+        stopped_by = "early_stopping"
+    else:
+        stopped_by = "max_epochs"
+    
+    if val_idx is not None:
+        # Weights terbaik juga saat fit dihentikan budget waktu (bukan oleh EarlyStopping)
+        if early_stop.best_weights is not None:
+            model.set_weights(early_stop.best_weights)
+        # Tail pass: window validasi adalah data terbaru, jangan sampai tidak pernah dilatih
+        model.fit(
+            make_training_dataset(normalized, look_back, indices=np.arange(n_windows), n_targets=n_targets),
+            epochs=TAIL_PASS_EPOCHS,
+            verbose=verbose,
+            shuffle=False,
+            callbacks=[budget] if budget is not None else [],
+        )
+    
+    val_losses = history.history.get("val_loss")
+    return {
+        "epochs_used": epochs_used,
+        "epochs_budget": epochs,
+        "stopped_by": stopped_by,
+        "train_seconds": round(time.perf_counter() - t0, 3),
+        "val_loss": float(min(val_losses)) if val_losses else None,
+        **({"tail_pass_epochs": TAIL_PASS_EPOCHS} if val_idx is not None else {}),
+    }
+
+
+def fit_keras_forecaster(
+    data: np.ndarray,
+    model_type: str = "lstm",
+    look_back: int = LOOK_BACK,
+    epochs: int = 20,
+    verbose: int = 0,
+) -> Tuple[Sequential, MinMaxScaler, Dict[str, Any]]:
+    """
+    Full training LSTM/RNN tanpa cache/store (dipakai train_forecast_model dan backtest).
+    
+    Args:
+        data: 1D target, atau 2D (timesteps, 1 + k) dengan kolom exogenous (lihat exogenous.with_exog)
+    
+    Returns:
+        (PooledForecaster, scaler, ringkasan training dari _fit_with_budget)
+    """
+    # Normalize target (scaler ini dipakai ulang untuk last sequence saat forecast);
+    # kolom exogenous sudah di kisaran [-1, 1] dan dipakai apa adanya
+    data = np.asarray(data, dtype=float)
+    n_features = data.shape[1] if data.ndim == 2 else 1
+    target = data[:, 0] if data.ndim == 2 else data
+    normalized_data, scaler = normalize_data(target)
+    if data.ndim == 2:
+        normalized_data = np.column_stack([normalized_data, data[:, 1:]])
+    
+    if model_type not in ("lstm", "rnn"):
+        raise ValueError("model_type harus 'lstm' atau 'rnn'")
+    
+    # Train di template pool (weights + state optimizer di-reset ke inisialisasi template):
+    # train function yang sudah di-trace dipakai ulang. Window di-gather per batch dari buffer
+    # normalized (tanpa salinan X), berhenti saat val_loss plateau atau budget waktu habis
+    with _TEMPLATE_POOL.acquire((model_type, look_back, n_features, 1), reset=True) as keras_model:
+        training = _fit_with_budget(keras_model, normalized_data, look_back, epochs, verbose)
+        model = PooledForecaster.from_keras(keras_model)
+    return model, scaler, training
+
+
+def _try_incremental_update(
+    data: np.ndarray,
+    model_type: str,
+    granularity: str,
+    metric: str,
+    look_back: int,
+) -> Optional[Tuple[Sequential, MinMaxScaler, int]]:
+    """
+    Warm-start: load weights model sebelumnya untuk cache key yang sama dan
+    fine-tune beberapa epoch hanya pada window yang baru ditambahkan.
+    
+    Return None (-> full retrain) jika: belum ada model/deret lama, schema atau
+    look_back berubah, data bukan pola append, nilai baru drift keluar dari range
+    scaler, atau sudah terlalu banyak update incremental berturut-turut.
+    
+    Returns:
+        (model, scaler, incremental_updates) atau None
+    """
+    meta = _STORE.read_manifest(_cache_key(model_type, granularity, metric))
+    if not meta or meta.get("schema_version") != CACHE_SCHEMA_VERSION or meta.get("look_back") != look_back:
+        return None
+    updates = int(meta.get("incremental_updates", 0))
+    if updates >= settings.FORECAST_INCREMENTAL_MAX_UPDATES:
+        return None
+    
+    series_ref = meta.get("files", {}).get("series")
+    if series_ref is None:
+        return None
+    try:
+        prev = np.load(_STORE.blob_path(series_ref))
+    except OSError:
+        return None
+    start = _find_appended_start(prev, data, max_shift=len(prev) // 2)
+    if start is None:
+        return None
+    
+    cached = _load_model_cache(model_type, granularity, metric, meta.get("data_hash"), for_serving=False)
+    if cached is None:
+        return None
+    model, scaler = cached
+    
+    # Drift check: nilai baru harus tetap di dalam range scaler (+ toleransi)
+    lo, hi = float(scaler.data_min_[0]), float(scaler.data_max_[0])
+    tol = (hi - lo) * DRIFT_RANGE_TOLERANCE
+    new_vals = data[start:]
+    if new_vals.min() < lo - tol or new_vals.max() > hi + tol:
+        return None
+    
+    # Hanya window yang target-nya ada di bagian baru
+    normalized_data = scaler.transform(data.reshape(-1, 1)).flatten()
+    X, y = prepare_timeseries(normalized_data, look_back)
+    first = max(0, start - look_back)
+    X, y = X[first:, :, None], y[first:]
+    if len(X) == 0:
+        return None
+    
+    # Fine-tune di template pinjaman; weights model yang sedang di-serve tidak tersentuh
+    with _as_keras(model) as keras_model:
+        _fine_tune(keras_model, X, y, epochs=settings.FORECAST_INCREMENTAL_EPOCHS)
+        model = PooledForecaster.from_keras(keras_model)
+    return model, scaler, updates + 1
+
+
+# ======================== Retrain Policy ========================
+
+def _retrain_policy(policy: Optional[RetrainPolicy] = None) -> RetrainPolicy:
+    return policy or get_retrain_policy(settings.FORECAST_RETRAIN_POLICY)
+
+
+def _count_retrain_decision(reason: str) -> None:
+    with _RETRAIN_DECISIONS_LOCK:
+        _RETRAIN_DECISIONS[reason] = _RETRAIN_DECISIONS.get(reason, 0) + 1
+
+
+def _model_state(cache_key: str, manifest: Dict[str, Any], data: np.ndarray, scaler: MinMaxScaler) -> ModelState:
+    """Umur model, seberapa jauh deret baru keluar dari range scaler, dan error terealisasi (normalized)."""
+    target = np.asarray(data, dtype=float)
+    if target.ndim == 2:
+        target = target[:, 0]
+    scale, offset = float(scaler.scale_[0]), float(scaler.min_[0])
+    normalized = target * scale + offset
+    range_excess = max(0.0, -float(normalized.min()), float(normalized.max()) - 1.0)
+    error = _ERROR_LOG.recent_error(
+        cache_key, manifest.get("data_hash"),
+        settings.FORECAST_RETRAIN_ERROR_WINDOW, settings.FORECAST_RETRAIN_MIN_ERROR_POINTS,
+    )
+    val_loss = manifest.get("val_loss")
+    return ModelState(
+        _manifest_age_s(manifest),
+        range_excess,
+        None if error is None else error * scale,
+        baseline_error=None if val_loss is None else float(np.sqrt(val_loss)),
+    )
+
+
+def _policy_decision(
+    policy: RetrainPolicy,
+    data: np.ndarray,
+    model_type: str,
+    granularity: str,
+    metric: str,
+    look_back: int,
+) -> Tuple[Optional[Tuple[Sequential, MinMaxScaler]], str]:
+    """
+    Apakah model yang ada untuk key ini tetap dipakai untuk deret baru `data`.
+    
+    Returns:
+        ((model, scaler), alasan) jika policy mempertahankan model, atau (None, alasan) -> latih
+    """
+    if not policy.keeps_models:
+        return None, "data_changed"
+    cache_key = _cache_key(model_type, granularity, metric)
+    manifest = _STORE.read_manifest(cache_key)
+    if manifest is None or manifest.get("schema_version") != CACHE_SCHEMA_VERSION or manifest.get("look_back") != look_back:
+        return None, "no_model"
+    cached = _get_cached_model(model_type, granularity, metric, manifest.get("data_hash"))
+    if cached is None:
+        return None, "no_model"
+    n_features = data.shape[1] if np.ndim(data) == 2 else 1
+    if int(cached[0].input_shape[-1]) != n_features:
+        return None, "shape_changed"
+    retrain, reason = policy.should_retrain(_model_state(cache_key, manifest, data, cached[1]))
+    return (None if retrain else cached), reason
+
+
+def _realize_forecast_errors(cache_key: str, timestamps: List[datetime], data: np.ndarray) -> None:
+    """Cocokkan forecast tercatat model saat ini dengan bucket historis yang sudah terisi."""
+    manifest = _STORE.read_manifest(cache_key)
+    if manifest is None:
+        return
+    try:
+        _ERROR_LOG.realize(cache_key, manifest.get("data_hash"), timestamps, data)
+    except OSError as e:
+        logging.warning("[forecast] log error forecast %s gagal diperbarui: %s", cache_key, e)
+
+
+def _record_forecast(cache_key: str, target_timestamps: List[datetime], forecast_values: np.ndarray) -> None:
+    manifest = _STORE.read_manifest(cache_key)
+    if manifest is None:
+        return
+    try:
+        _ERROR_LOG.record(cache_key, manifest.get("data_hash"), target_timestamps, forecast_values)
+    except OSError as e:
+        logging.warning("[forecast] log forecast %s gagal ditulis: %s", cache_key, e)
+
+
 def train_forecast_model(
     data: np.ndarray,
     model_type: str = "lstm",
@@ -208,10 +899,13 @@ def train_forecast_model(
     epochs: int = 20,
     verbose: int = 0,
     force_retrain: bool = False,
+    incremental: bool = settings.FORECAST_INCREMENTAL_TRAINING,
+    policy: Optional[RetrainPolicy] = None,
 ) -> Tuple[Sequential, MinMaxScaler]:
     """
     Train LSTM atau RNN model pada historical data.
-    Automatic caching: jika data tidak berubah, load dari cache.
+    Automatic caching: jika data tidak berubah, load dari cache. Jika data berubah, retrain
+    policy memutuskan apakah model yang ada tetap dipakai (lihat retrain_policy.py).
     
     Args:
         data: 1D array dari historical values
@@ -219,65 +913,455 @@ def train_forecast_model(
         granularity: "daily", "weekly", "monthly" (untuk cache key)
         metric: metric name (untuk cache key)
         look_back: lookback period
-        epochs: training epochs
+        epochs: batas atas training epochs (early stopping / budget waktu bisa berhenti lebih awal)
         verbose: verbosity level
         force_retrain: bypass cache dan train ulang
+        incremental: coba warm-start (fine-tune pada window baru) sebelum full retrain
+        policy: retrain policy (default settings.FORECAST_RETRAIN_POLICY)
         
     Returns:
         (trained_model, scaler)
+    
+    Raises:
+        TrainingQueueFull: model harus dilatih tapi antrean executor training penuh
     """
     data_hash = _get_data_hash(data)
-    
-    # Cek cache terlebih dahulu (kecuali force_retrain)
+    # Cek cache terlebih dahulu: memory -> disk (kecuali force_retrain), di thread caller
     if not force_retrain:
-        cached = _load_model_cache(model_type, granularity, metric, data_hash)
+        cached = _get_cached_model(model_type, granularity, metric, data_hash)
         if cached is not None:
             return cached
+        kept, reason = _policy_decision(_retrain_policy(policy), data, model_type, granularity, metric, look_back)
+        _count_retrain_decision(reason)
+        if kept is not None:
+            return kept
     
-    # Normalize
-    normalized_data, scaler = normalize_data(data)
-    
-    # Prepare sequences
-    X, y = prepare_timeseries(normalized_data, look_back)
-    X = X.reshape((X.shape[0], X.shape[1], 1))  # (samples, timesteps, features)
-    
-    # Build model
-    if model_type == "lstm":
-        model = build_lstm_model(look_back)
-    elif model_type == "rnn":
-        model = build_rnn_model(look_back)
-    else:
-        raise ValueError("model_type harus 'lstm' atau 'rnn'")
-    
-    # Train
-    model.fit(X, y, epochs=epochs, batch_size=BATCH_SIZE, verbose=verbose)
+    # Training di executor terbatas; thread request hanya menunggu hasilnya.
+    # Request lain untuk key + data yang sama menunggu future yang sama (single-flight);
+    # worker lain menunggu di _STORE.lock lalu memakai model yang disimpan di sini.
+    return _TRAIN_EXECUTOR.run_once(
+        _train_job_key(model_type, granularity, metric, data_hash),
+        _train_forecast_model, data, model_type, granularity, metric,
+        look_back, epochs, verbose, force_retrain, incremental, policy,
+    )
+
+
+def _train_forecast_model(
+    data: np.ndarray,
+    model_type: str,
+    granularity: str,
+    metric: str,
+    look_back: int,
+    epochs: int,
+    verbose: int,
+    force_retrain: bool,
+    incremental: bool,
+    policy: Optional[RetrainPolicy] = None,
+) -> Tuple[Sequential, MinMaxScaler]:
+    """Body train_forecast_model; berjalan di thread _TRAIN_EXECUTOR."""
+    data_hash = _get_data_hash(data)
+    memory_key = (granularity, metric, model_type, data_hash)
     
-    # Simpan ke cache
-    _save_model_cache(model_type, granularity, metric, model, scaler, data_hash, len(data))
+    # Training + simpan di bawah lock per key: worker lain yang melatih key yang sama menunggu
+    with _STORE.lock(_cache_key(model_type, granularity, metric)):
+        if not force_retrain:
+            # Re-check: mungkin worker lain baru saja selesai melatih data yang sama
+            cached = _get_cached_model(model_type, granularity, metric, data_hash)
+            if cached is not None:
+                return cached
+            kept, _ = _policy_decision(_retrain_policy(policy), data, model_type, granularity, metric, look_back)
+            if kept is not None:
+                return kept
+        
+            # Warm-start jika data hanya bertambah di ujung (hanya deret univariate)
+            if incremental and np.ndim(data) == 1:
+                updated = _try_incremental_update(data, model_type, granularity, metric, look_back)
+                if updated is not None:
+                    model, scaler, updates = updated
+                    # val_loss full training terakhir dibawa ke manifest baru: baseline error
+                    # retrain policy drift (fine-tune tidak punya window validasi sendiri)
+                    previous = _STORE.read_manifest(_cache_key(model_type, granularity, metric)) or {}
+                    _save_model_cache(
+                        model_type, granularity, metric, model, scaler, data_hash, len(data),
+                        series=data, look_back=look_back, train_mode="incremental", incremental_updates=updates,
+                        training={
+                            "epochs_used": settings.FORECAST_INCREMENTAL_EPOCHS,
+                            "val_loss": previous.get("val_loss"),
+                        },
+                    )
+                    _MODEL_CACHE.put(memory_key, (model, scaler), estimate_model_bytes(model))
+                    _remember_last_good(model_type, granularity, metric, (model, scaler))
+                    return model, scaler
+        
+        model, scaler, training = fit_keras_forecaster(data, model_type, look_back, epochs, verbose)
+        
+        # Simpan ke store
+        _save_model_cache(
+            model_type, granularity, metric, model, scaler, data_hash, len(data),
+            series=data, look_back=look_back, training=training,
+        )
+    _MODEL_CACHE.put(memory_key, (model, scaler), estimate_model_bytes(model))
+    _remember_last_good(model_type, granularity, metric, (model, scaler))
     
     return model, scaler
 
 
-# ======================== Forecasting ========================
+def _refresh_in_background(
+    data: np.ndarray,
+    model_type: str,
+    granularity: str,
+    metric: str,
+    epochs: int,
+) -> None:
+    """
+    Jadwalkan retrain di executor training (dilewati jika antrean penuh). Memakai key
+    single-flight yang sama dengan train_forecast_model: retrain background dan request
+    sinkron untuk data yang sama berbagi satu job.
+    """
+    data_hash = _get_data_hash(data)
+    job_key = _train_job_key(model_type, granularity, metric, data_hash)
+    try:
+        future = _TRAIN_EXECUTOR.submit_once(
+            job_key, _train_forecast_model, data, model_type, granularity, metric,
+            LOOK_BACK, epochs, 0, False, settings.FORECAST_INCREMENTAL_TRAINING,
+        )
+    except TrainingQueueFull:
+        logging.warning("[forecast] antrean training penuh, background retrain %s dilewati", job_key[1:4])
+        return
+    future.add_done_callback(_log_background_failure(f"background retrain {job_key[1:4]}"))
 
-def forecast_ahead(
-    model: Sequential,
-    scaler: MinMaxScaler,
-    last_sequence: np.ndarray,
-    steps_ahead: int,
-) -> np.ndarray:
+
+def _log_background_failure(job: str) -> Callable[[Any], None]:
+    """Done-callback job background: exception di-log (tidak ada caller yang menunggu)."""
+    def _callback(future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logging.error("[forecast] %s gagal", job, exc_info=future.exception())
+    return _callback
+
+
+def _resolve_without_training(
+    data: np.ndarray,
+    model_type: str,
+    granularity: str,
+    metric: str,
+    epochs: int,
+    stale_ok: bool,
+) -> Optional[Tuple[Sequential, MinMaxScaler, bool]]:
     """
-    Generate forecast untuk N steps ke depan.
+    Model yang bisa langsung dipakai tanpa menunggu training: cache (data sama), model yang
+    dipertahankan retrain policy, atau (stale_ok) model terakhir + retrain di background.
     
-    Args:
-        model: trained keras model
-        scaler: MinMaxScaler yang digunakan saat training
-        last_sequence: normalized sequence terakhir (shape: (look_back,))
-        steps_ahead: number of steps to forecast
-        
     Returns:
-        forecast values dalam skala original (shape: (steps_ahead,))
+        (model, scaler, stale), atau None jika caller harus melatih secara sinkron
     """
+    fresh = _get_cached_model(model_type, granularity, metric, _get_data_hash(data))
+    if fresh is not None:
+        return fresh[0], fresh[1], False
+    kept, reason = _policy_decision(_retrain_policy(), data, model_type, granularity, metric, LOOK_BACK)
+    _count_retrain_decision(reason)
+    if kept is not None:
+        return kept[0], kept[1], False
+    if stale_ok:
+        last_good = _get_last_good_model(model_type, granularity, metric)
+        if last_good is not None:
+            _refresh_in_background(data, model_type, granularity, metric, epochs)
+            return last_good[0], last_good[1], True
+    return None
+
+
+def resolve_forecast_model(
+    data: np.ndarray,
+    model_type: str,
+    granularity: str,
+    metric: str,
+    epochs: int,
+    stale_ok: bool = False,
+) -> Tuple[Sequential, MinMaxScaler, bool]:
+    """
+    Ambil model untuk forecast.
+    
+    stale_ok=False: perilaku lama (train sinkron jika data berubah).
+    stale_ok=True: jika model untuk data terbaru belum ada, pakai model terakhir
+    yang valid dan retrain di background. Train sinkron hanya jika belum ada model sama sekali.
+    
+    Returns:
+        (model, scaler, stale)
+    """
+    ready = _resolve_without_training(data, model_type, granularity, metric, epochs, stale_ok)
+    if ready is not None:
+        return ready
+    # Cache + policy sudah dicek di atas; training di executor (dicek ulang di bawah lock)
+    model, scaler = _TRAIN_EXECUTOR.run_once(
+        _train_job_key(model_type, granularity, metric, _get_data_hash(data)),
+        _train_forecast_model, data, model_type, granularity, metric,
+        LOOK_BACK, epochs, 0, False, settings.FORECAST_INCREMENTAL_TRAINING,
+    )
+    return model, scaler, False
+
+
+def last_sequence_for(data: np.ndarray, scaler: MinMaxScaler, look_back: int = LOOK_BACK) -> np.ndarray:
+    """
+    Normalisasi `look_back` data terakhir dengan scaler milik model.
+    Data 2D (target + exogenous): hanya kolom 0 yang dinormalisasi, shape (look_back, 1 + k).
+    """
+    tail = np.asarray(data[-look_back:], dtype=float)
+    if tail.ndim == 2:
+        target = scaler.transform(tail[:, :1]).flatten()
+        return np.column_stack([target, tail[:, 1:]])
+    return scaler.transform(tail.reshape(-1, 1)).flatten()
+
+
+# ======================== Window-invariant (global) models ========================
+#
+# Model biasa di-key dengan hash window request, sehingga hours=72 vs hours=96 atau ref
+# berbeda melatih model terpisah. Model global dilatih sekali per (frekuensi, metric,
+# model_type) pada histori penuh (history_loader dari caller) dan dipakai untuk window apa
+# pun: window request hanya jadi input rollout. Dilatih ulang jika umurnya melewati
+# settings.FORECAST_GLOBAL_REFRESH_S (dipicu request / precompute per jam).
+
+def _global_granularity(granularity: str) -> str:
+    """Key model global: satu model hourly (daily) dan satu model harian (weekly + monthly)."""
+    return "global_hourly" if granularity == "daily" else "global_daily"
+
+
+def _manifest_age_s(manifest: Dict[str, Any], field: str = "trained_at") -> float:
+    try:
+        return (datetime.now(tz=None) - datetime.fromisoformat(manifest[field])).total_seconds()
+    except (KeyError, TypeError, ValueError):
+        return float("inf")
+
+
+def _global_model_fresh(manifest: Optional[Dict[str, Any]]) -> bool:
+    return manifest is not None and _manifest_age_s(manifest) < settings.FORECAST_GLOBAL_REFRESH_S
+
+
+def train_global_model(
+    history: np.ndarray,
+    model_type: str,
+    granularity: str,
+    metric: str,
+    epochs: int,
+    force_retrain: bool = False,
+) -> Tuple[Sequential, MinMaxScaler]:
+    """
+    Latih model global pada histori penuh (dilewati jika model yang ada masih segar).
+    Single-flight per key tanpa data_hash: refresh bersamaan dengan histori yang berbeda
+    beberapa jam tetap satu training.
+    """
+    global_granularity = _global_granularity(granularity)
+    return _TRAIN_EXECUTOR.run_once(
+        _train_job_key(model_type, global_granularity, metric, "latest"),
+        _train_global_model, history, model_type, global_granularity, metric, epochs, force_retrain,
+    )
+
+
+def _train_global_model(
+    history: np.ndarray,
+    model_type: str,
+    global_granularity: str,
+    metric: str,
+    epochs: int,
+    force_retrain: bool,
+) -> Tuple[Sequential, MinMaxScaler]:
+    """Body train_global_model; berjalan di thread _TRAIN_EXECUTOR."""
+    cache_key = _cache_key(model_type, global_granularity, metric)
+    with _STORE.lock(cache_key):
+        if not force_retrain:
+            # Re-check: worker lain mungkin baru saja me-refresh model ini
+            manifest = _STORE.read_manifest(cache_key)
+            if _global_model_fresh(manifest):
+                cached = _get_cached_model(model_type, global_granularity, metric, manifest["data_hash"])
+                if cached is not None:
+                    return cached
+
+        history = np.asarray(history, dtype=float)
+        data_hash = _get_data_hash(history)
+        model, scaler, training = fit_keras_forecaster(history, model_type, LOOK_BACK, epochs)
+        _save_model_cache(
+            model_type, global_granularity, metric, model, scaler, data_hash, len(history),
+            look_back=LOOK_BACK, train_mode="global", training=training,
+        )
+    _MODEL_CACHE.put((global_granularity, metric, model_type, data_hash), (model, scaler), estimate_model_bytes(model))
+    _remember_last_good(model_type, global_granularity, metric, (model, scaler))
+    return model, scaler
+
+
+def _refresh_global_in_background(
+    history_loader: Callable[[], np.ndarray],
+    model_type: str,
+    granularity: str,
+    metric: str,
+    epochs: int,
+) -> None:
+    """Refresh model global di executor training (histori di-load di thread training)."""
+    global_granularity = _global_granularity(granularity)
+
+    def _job():
+        return _train_global_model(history_loader(), model_type, global_granularity, metric, epochs, False)
+
+    try:
+        future = _TRAIN_EXECUTOR.submit_once(
+            _train_job_key(model_type, global_granularity, metric, "latest"), _job
+        )
+    except TrainingQueueFull:
+        logging.warning("[forecast] antrean training penuh, refresh model global %s/%s/%s dilewati",
+                        global_granularity, metric, model_type)
+        return
+    future.add_done_callback(
+        _log_background_failure(f"refresh model global {global_granularity}/{metric}/{model_type}")
+    )
+
+
+def resolve_global_model(
+    history_loader: Callable[[], np.ndarray],
+    model_type: str,
+    granularity: str,
+    metric: str,
+    epochs: int,
+    stale_ok: bool = False,
+) -> Tuple[Sequential, MinMaxScaler, bool]:
+    """
+    Ambil model global untuk (granularity, metric, model_type), tidak bergantung window request.
+    
+    Args:
+        history_loader: callable -> histori penuh (hanya dipanggil jika model perlu dilatih)
+        stale_ok: model lewat umur refresh tetap dipakai, refresh di background
+        
+    Returns:
+        (model, scaler, stale)
+    """
+    global_granularity = _global_granularity(granularity)
+    manifest = _STORE.read_manifest(_cache_key(model_type, global_granularity, metric))
+    if manifest is not None:
+        cached = _get_cached_model(model_type, global_granularity, metric, manifest.get("data_hash"))
+        if cached is not None:
+            if _global_model_fresh(manifest):
+                return cached[0], cached[1], False
+            if stale_ok:
+                _refresh_global_in_background(history_loader, model_type, granularity, metric, epochs)
+                return cached[0], cached[1], True
+
+    model, scaler = train_global_model(history_loader(), model_type, granularity, metric, epochs)
+    return model, scaler, False
+
+
+# ======================== Forecasting ========================
+
+# Engine dengan rollout / rollout_samples sendiri (selain model Keras mentah)
+_INFERENCE_ENGINES = (NumpyForecaster, TFLiteForecaster, PooledForecaster)
+
+# Compiled rollout function per model instance (dibuang otomatis saat model di-GC: closure
+# hanya memegang weakref ke model, lihat _get_rollout_fn); untuk PooledForecaster instance ini
+# adalah template pool, jadi trace dipakai ulang lintas model
+_ROLLOUT_FNS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _get_rollout_fn(model: Sequential):
+    """
+    Ambil (atau buat) tf.function yang menjalankan seluruh autoregressive loop
+    di dalam satu graph. Signature tetap (seq (look_back, channels) float32, steps int32,
+    exog (steps, channels - outputs) float32) sehingga horizon 24/7/30 memakai trace yang
+    sama. Dipakai untuk model univariate (channels=1), multivariate, maupun model
+    exogenous (output 1, baris berikutnya = prediksi + fitur exogenous step tersebut).
+    """
+    fn = _ROLLOUT_FNS.get(model)
+    if fn is not None:
+        return fn
+
+    tf = _tf()
+    n_channels = int(model.input_shape[-1])
+    n_exog = n_channels - int(model.output_shape[-1])
+    # Weakref: referensi kuat dari value (closure) ke key membuat entry WeakKeyDictionary
+    # tidak pernah dibuang
+    model_ref = weakref.ref(model)
+
+    @tf.function(
+        input_signature=[
+            tf.TensorSpec(shape=[None, n_channels], dtype=tf.float32),
+            tf.TensorSpec(shape=[], dtype=tf.int32),
+            tf.TensorSpec(shape=[None, n_exog], dtype=tf.float32),
+        ]
+    )
+    def rollout(seq, steps, exog):
+        outputs = tf.TensorArray(tf.float32, size=steps)
+        for i in tf.range(steps):
+            next_val = model_ref()(tf.expand_dims(seq, 0), training=False)
+            outputs = outputs.write(i, next_val[0])
+            # Update sequence: drop first, append predicted (+ fitur exogenous yang sudah diketahui)
+            seq = tf.concat([seq[1:], tf.concat([next_val, exog[i:i + 1]], axis=1)], axis=0)
+        return outputs.stack()
+
+    _ROLLOUT_FNS[model] = rollout
+    return rollout
+
+
+def _exog_or_empty(exog_future: Optional[np.ndarray], steps_ahead: int) -> np.ndarray:
+    if exog_future is None:
+        return np.zeros((steps_ahead, 0), dtype=np.float32)
+    return np.asarray(exog_future, dtype=np.float32)[:steps_ahead]
+
+
+def _rollout_normalized(
+    model,
+    last_sequence: np.ndarray,
+    steps_ahead: int,
+    exog_future: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Rollout dalam skala normalized, shape (steps, outputs). Model Keras atau engine inference
+    (NumpyForecaster, TFLiteForecaster, PooledForecaster).
+    exog_future: fitur exogenous (steps, k) untuk model exogenous, None untuk model tanpa exogenous.
+    """
+    seq = np.asarray(last_sequence, dtype=np.float32)
+    if isinstance(model, _INFERENCE_ENGINES):
+        return model.rollout(seq, steps_ahead, exog=exog_future)
+    return _rollout_keras(model, seq, steps_ahead, exog_future)
+
+
+def _rollout_keras(
+    model: Sequential,
+    last_sequence: np.ndarray,
+    steps_ahead: int,
+    exog_future: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    tf = _tf()
+    rollout = _get_rollout_fn(model)
+    seq = np.asarray(last_sequence, dtype=np.float32)
+    exog = _exog_or_empty(exog_future, steps_ahead)
+    return rollout(tf.constant(seq), tf.constant(steps_ahead, dtype=tf.int32), tf.constant(exog)).numpy()
+
+
+def forecast_ahead(
+    model: Sequential,
+    scaler: MinMaxScaler,
+    last_sequence: np.ndarray,
+    steps_ahead: int,
+    fast: bool = True,
+    exog_future: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Generate forecast untuk N steps ke depan.
+    
+    Args:
+        model: trained keras model atau engine inference (Numpy/TFLite/PooledForecaster)
+        scaler: MinMaxScaler yang digunakan saat training
+        last_sequence: normalized sequence terakhir (shape: (look_back,), atau
+                       (look_back, 1 + k) untuk model exogenous)
+        steps_ahead: number of steps to forecast
+        fast: True = seluruh rollout dijalankan dalam satu compiled tf.function;
+              False = legacy loop dengan satu model.predict per step (hanya univariate)
+        exog_future: fitur exogenous (steps_ahead, k) untuk model exogenous
+        
+    Returns:
+        forecast values dalam skala original (shape: (steps_ahead,))
+    """
+    if fast or exog_future is not None or isinstance(model, _INFERENCE_ENGINES):
+        seq = np.asarray(last_sequence)
+        if seq.ndim == 1:
+            seq = seq.reshape(-1, 1)
+        forecasts_normalized = _rollout_normalized(model, seq, steps_ahead, exog_future)
+        return denormalize_data(forecasts_normalized, scaler)
+
     forecasts = []
     current_seq = last_sequence.copy()
     
@@ -296,10 +1380,364 @@ def forecast_ahead(
     return forecasts_original
 
 
+# ======================== Prediction Intervals (MC dropout) ========================
+
+# Quantile band yang dilaporkan (persen)
+INTERVAL_QUANTILES = (10, 50, 90)
+
+# Compiled batched rollout (dropout aktif) per model instance; closure memegang weakref ke
+# model seperti _get_rollout_fn, jadi entry dibuang saat model di-GC
+_MC_ROLLOUT_FNS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _get_mc_rollout_fn(model: Sequential):
+    """
+    tf.function: N rollout autoregressive sekaligus dengan training=True (Dropout aktif).
+    Input satu tensor (N, look_back, channels), jadi biaya N sampel ~ satu rollout
+    dengan batch N, bukan N loop terpisah. exog (steps, k) sama untuk semua sampel.
+    """
+    fn = _MC_ROLLOUT_FNS.get(model)
+    if fn is not None:
+        return fn
+
+    tf = _tf()
+    n_channels = int(model.input_shape[-1])
+    n_exog = n_channels - int(model.output_shape[-1])
+    model_ref = weakref.ref(model)
+
+    @tf.function(
+        input_signature=[
+            tf.TensorSpec(shape=[None, None, n_channels], dtype=tf.float32),
+            tf.TensorSpec(shape=[], dtype=tf.int32),
+            tf.TensorSpec(shape=[None, n_exog], dtype=tf.float32),
+        ]
+    )
+    def mc_rollout(seqs, steps, exog):
+        outputs = tf.TensorArray(tf.float32, size=steps)
+        n = tf.shape(seqs)[0]
+        for i in tf.range(steps):
+            next_val = model_ref()(seqs, training=True)  # (N, outputs), mask dropout beda per sampel
+            outputs = outputs.write(i, next_val)
+            next_row = tf.concat([next_val, tf.tile(exog[i:i + 1], [n, 1])], axis=1)
+            seqs = tf.concat([seqs[:, 1:], next_row[:, None, :]], axis=1)
+        return tf.transpose(outputs.stack(), [1, 0, 2])  # (N, steps, outputs)
+
+    _MC_ROLLOUT_FNS[model] = mc_rollout
+    return mc_rollout
+
+
+def _mc_samples_keras(
+    model: Sequential,
+    last_sequence: np.ndarray,
+    steps_ahead: int,
+    n_samples: int,
+    exog_future: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Sampel MC dropout model Keras, shape (n_samples, steps, outputs), skala normalized."""
+    tf = _tf()
+    batch = np.repeat(np.asarray(last_sequence, dtype=np.float32)[None, :, :], n_samples, axis=0)
+    exog = _exog_or_empty(exog_future, steps_ahead)
+    return _get_mc_rollout_fn(model)(
+        tf.constant(batch), tf.constant(steps_ahead, dtype=tf.int32), tf.constant(exog)
+    ).numpy()
+
+
+def forecast_intervals(
+    model: Sequential,
+    scaler: MinMaxScaler,
+    last_sequence: np.ndarray,
+    steps_ahead: int,
+    n_samples: Optional[int] = None,
+    exog_future: Optional[np.ndarray] = None,
+) -> Dict[str, any]:
+    """
+    Prediction interval p10/p50/p90 via MC dropout pada layer Dropout(DROPOUT_RATE).
+    
+    Args:
+        model: trained keras model, NumpyForecaster, PooledForecaster atau TFLiteForecaster (MC via .npz)
+        last_sequence: normalized sequence terakhir (shape: (look_back,) atau (look_back, 1 + k))
+        n_samples: jumlah rollout stokastik (default settings.FORECAST_MC_SAMPLES)
+        exog_future: fitur exogenous (steps_ahead, k) untuk model exogenous
+        
+    Returns:
+        {"p10": [...], "p50": [...], "p90": [...], "method": "mc_dropout", "samples": N}
+        (skala original, panjang masing-masing steps_ahead)
+    """
+    n_samples = n_samples or settings.FORECAST_MC_SAMPLES
+    seq = np.asarray(last_sequence, dtype=np.float32)
+    if seq.ndim == 1:
+        seq = seq.reshape(-1, 1)
+    if isinstance(model, _INFERENCE_ENGINES):
+        samples = model.rollout_samples(seq, steps_ahead, n_samples, exog=exog_future)
+    else:
+        samples = _mc_samples_keras(model, seq, steps_ahead, n_samples, exog_future)
+
+    values = denormalize_data(samples[:, :, 0].reshape(-1), scaler).reshape(n_samples, steps_ahead)
+    bands = np.percentile(values, INTERVAL_QUANTILES, axis=0)
+    result = {f"p{q}": bands[i].tolist() for i, q in enumerate(INTERVAL_QUANTILES)}
+    result.update({"method": "mc_dropout", "samples": n_samples})
+    return result
+
+
+# Frekuensi data historis per granularity forecast
+_HISTORY_FREQ = {"daily": "hourly", "weekly": "daily", "monthly": "daily"}
+
+
+def use_exogenous(timestamps: Optional[List[datetime]]) -> bool:
+    """Model lstm/rnn memakai fitur exogenous jika diaktifkan dan timestamp bucket tersedia."""
+    return settings.FORECAST_EXOGENOUS and timestamps is not None
+
+
+def exog_model_metric(metric: str, with_temperature: bool) -> str:
+    """Key metric model exogenous (terpisah dari model univariate metric yang sama)."""
+    return f"{metric}+exog+temp" if with_temperature else f"{metric}+exog"
+
+
+# ======================== Auto model selection ========================
+#
+# model_type=auto: model lstm dan rnn biasa (deret penuh, key yang sama dengan model_type=lstm /
+# rnn) di-resolve bersamaan di executor training, lalu dinilai dengan val_loss di manifest
+# masing-masing: MSE (skala normalized, scaler yang sama karena deretnya sama) pada ekor
+# validasi kontigu yang belum dilihat model saat early stopping. Pemenang langsung dipakai untuk
+# forecast, jadi penilaian tidak menambah training. Pilihan disimpan di state ModelStore per
+# (granularity, metric) dan dipakai ulang (hanya model pemenang yang di-resolve / dilatih ulang)
+# sampai lebih tua dari FORECAST_AUTO_REEVALUATE_S.
+
+AUTO_MODEL_TYPE = "auto"
+AUTO_CANDIDATES = ("lstm", "rnn")
+AUTO_SCORE = "val_loss"
+# Ekstensi file state pilihan model_type=auto per key
+AUTO_CHOICE_EXT = ".auto_choice.json"
+
+
+def _read_auto_choice(choice_key: str) -> Optional[Dict[str, Any]]:
+    raw = _STORE.read_state(choice_key, AUTO_CHOICE_EXT)
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def _auto_choice_fresh(choice: Optional[Dict[str, Any]]) -> bool:
+    return (
+        choice is not None
+        and choice.get("selected") in AUTO_CANDIDATES
+        and choice.get("score") == AUTO_SCORE
+        and _manifest_age_s(choice, "chosen_at") < settings.FORECAST_AUTO_REEVALUATE_S
+    )
+
+
+def _resolve_auto_candidates(
+    data: np.ndarray,
+    granularity: str,
+    metric: str,
+    epochs: int,
+    stale_ok: bool,
+) -> Dict[str, Tuple[Sequential, MinMaxScaler, bool]]:
+    """
+    Resolve semua kandidat. Yang perlu dilatih disubmit sekaligus ke executor training
+    (single-flight dengan key training biasa) lalu ditunggu bersama: dengan
+    FORECAST_TRAIN_WORKERS >= 2 biayanya satu training wall-clock, bukan dua berurutan.
+    """
+    data_hash = _get_data_hash(data)
+    resolved, pending = {}, {}
+    for model_type in AUTO_CANDIDATES:
+        ready = _resolve_without_training(data, model_type, granularity, metric, epochs, stale_ok)
+        if ready is not None:
+            resolved[model_type] = ready
+            continue
+        args = (
+            data, model_type, granularity, metric,
+            LOOK_BACK, epochs, 0, False, settings.FORECAST_INCREMENTAL_TRAINING,
+        )
+        if _TRAIN_EXECUTOR.in_worker():
+            # Sudah di thread training: latih inline (menunggu slot sendiri = deadlock)
+            resolved[model_type] = (*_train_forecast_model(*args), False)
+        else:
+            pending[model_type] = _TRAIN_EXECUTOR.submit_once(
+                _train_job_key(model_type, granularity, metric, data_hash), _train_forecast_model, *args,
+            )
+    for model_type, future in pending.items():
+        model, scaler = future.result()
+        resolved[model_type] = (model, scaler, False)
+    return resolved
+
+
+def resolve_auto_model(
+    data: np.ndarray,
+    granularity: str,
+    metric: str,
+    epochs: int,
+    stale_ok: bool = False,
+) -> Tuple[str, Sequential, MinMaxScaler, bool, Dict[str, Any]]:
+    """
+    Pilih lstm / rnn untuk model_type=auto dan ambil model pemenangnya.
+    
+    Args:
+        metric: key metric model (termasuk suffix exogenous)
+        
+    Returns:
+        (model_type pemenang, model, scaler, stale, selection) dengan selection =
+        {"selected", "scores": {"lstm": val_loss, "rnn": val_loss}, "score": "val_loss",
+         "chosen_at", "cached" (True = pilihan tersimpan dipakai ulang)}
+    """
+    choice_key = _cache_key(AUTO_MODEL_TYPE, granularity, metric)
+    choice = _read_auto_choice(choice_key)
+    if _auto_choice_fresh(choice):
+        selected = choice["selected"]
+        model, scaler, stale = resolve_forecast_model(data, selected, granularity, metric, epochs, stale_ok=stale_ok)
+        return selected, model, scaler, stale, {**choice, "cached": True}
+    
+    candidates = _resolve_auto_candidates(data, granularity, metric, epochs, stale_ok)
+    scores = {
+        model_type: (_STORE.read_manifest(_cache_key(model_type, granularity, metric)) or {}).get("val_loss")
+        for model_type in candidates
+    }
+    scored = {model_type: score for model_type, score in scores.items() if score is not None}
+    # Tanpa val_loss (early stopping nonaktif / window validasi terlalu sedikit): default lstm
+    selected = min(scored, key=scored.get) if scored else AUTO_CANDIDATES[0]
+    choice = {
+        "selected": selected,
+        "scores": scores,
+        "score": AUTO_SCORE,
+        "chosen_at": datetime.now(tz=None).isoformat(),
+    }
+    # Pilihan dari kandidat stale (retrain masih di background) tidak disimpan: request
+    # berikutnya menilai ulang dengan kandidat terbaru
+    if not any(c[2] for c in candidates.values()):
+        try:
+            _STORE.write_state(choice_key, json.dumps(choice).encode(), AUTO_CHOICE_EXT)
+        except OSError as e:
+            logging.warning("[forecast] pilihan model auto %s gagal disimpan: %s", choice_key, e)
+    model, scaler, stale = candidates[selected]
+    return selected, model, scaler, stale, {**choice, "cached": False}
+
+
+def _forecast_classical(
+    data: np.ndarray,
+    model_type: str,
+    granularity: str,
+    metric: str,
+    steps: int,
+    timestamps: Optional[List[datetime]] = None,
+) -> np.ndarray:
+    """
+    Forecast dengan model klasik (snaive / holt_winters / ridge_ar).
+    Model hasil fit (milidetik) di-cache di LRU yang sama dengan model Keras.
+    """
+    data_hash = _get_data_hash(data)
+    if timestamps is not None:
+        # ridge_ar bergantung pada kalender: posisi waktu ikut jadi bagian key
+        data_hash = f"{data_hash}@{timestamps[-1].isoformat()}"
+    key = (granularity, metric, model_type, data_hash)
+
+    model = _MODEL_CACHE.get(key)
+    if model is None:
+        model = fit_classical(model_type, data, _HISTORY_FREQ[granularity], timestamps)
+        _MODEL_CACHE.put(key, model, estimate_model_bytes(model))
+    return model.forecast(steps)
+
+
+def forecast_horizon(
+    data: np.ndarray,
+    model_type: str,
+    granularity: str,
+    metric: str,
+    steps: int,
+    epochs: int,
+    stale_ok: bool = False,
+    timestamps: Optional[List[datetime]] = None,
+    intervals: bool = False,
+    history_loader: Optional[Callable[[], np.ndarray]] = None,
+    exog_temperature: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, bool, Optional[Dict[str, any]], Optional[Dict[str, any]]]:
+    """
+    Forecast `steps` ke depan dengan model milik (granularity, metric, model_type), tanpa
+    format response. Dipakai forecast_daily/weekly/monthly dan mode hierarchical.
+    model_type="auto": lstm vs rnn dipilih per key (lihat resolve_auto_model).
+    
+    Args:
+        granularity: cache key model ("daily" = model hourly, "weekly"/"monthly" = model harian)
+        epochs: batas atas epoch jika model perlu dilatih
+        history_loader: jika diberikan (lstm/rnn), model global yang dilatih pada histori
+                        penuh dipakai; `data` hanya jadi input rollout. Dengan exogenous aktif
+                        loader harus mengembalikan matriks exogenous.with_exog yang sama
+        exog_temperature: temperatur per bucket sejajar `timestamps` (fitur exogenous energy_kwh)
+        
+    Returns:
+        (forecast_values, stale, interval bands atau None, selection model_type=auto atau None)
+    """
+    if len(data) < LOOK_BACK:
+        raise ValueError(f"Data harus minimal {LOOK_BACK} data points")
+    if intervals and model_type in CLASSICAL_MODEL_TYPES:
+        raise ValueError("Prediction interval (MC dropout) hanya tersedia untuk model lstm/rnn")
+    
+    if model_type in CLASSICAL_MODEL_TYPES:
+        return _forecast_classical(data, model_type, granularity, metric, steps, timestamps), False, None, None
+    if model_type == AUTO_MODEL_TYPE and history_loader is not None:
+        raise ValueError("model_type=auto tidak tersedia untuk model global (kandidat = model per window)")
+    
+    # Fitur exogenous (kalender + temperatur untuk energy): model terpisah dengan key metric "+exog"
+    model_data, model_metric, exog_future = data, metric, None
+    if use_exogenous(timestamps):
+        freq = _HISTORY_FREQ[granularity]
+        temperature = exog_temperature if metric in TEMPERATURE_DRIVEN_METRICS else None
+        model_data = with_exog(data, timestamps, freq, temperature)
+        exog_future = future_exog_features(timestamps[-1], steps, freq, temperature)
+        model_metric = exog_model_metric(metric, temperature is not None)
+    
+    # Retrain policy berbasis error: catat error terealisasi sebelum model dipilih (model global
+    # punya jadwal refresh sendiri). model_type=auto bisa melayani model lstm maupun rnn biasa
+    track_errors = history_loader is None and timestamps is not None and _retrain_policy().tracks_errors
+    if track_errors:
+        for candidate in (AUTO_CANDIDATES if model_type == AUTO_MODEL_TYPE else (model_type,)):
+            _realize_forecast_errors(_cache_key(candidate, granularity, model_metric), timestamps, model_data)
+    
+    selection = None
+    if model_type == AUTO_MODEL_TYPE:
+        model_type, model, scaler, stale, selection = resolve_auto_model(
+            model_data, granularity, model_metric, epochs, stale_ok=stale_ok
+        )
+    elif history_loader is not None:
+        model, scaler, stale = resolve_global_model(
+            history_loader, model_type, granularity, model_metric, epochs, stale_ok=stale_ok
+        )
+    else:
+        model, scaler, stale = resolve_forecast_model(
+            model_data,
+            model_type=model_type,
+            granularity=granularity,
+            metric=model_metric,
+            epochs=epochs,
+            stale_ok=stale_ok,
+        )
+    
+    # Get last sequence (normalized dengan scaler model)
+    last_seq = last_sequence_for(model_data, scaler)
+    forecast_values = forecast_ahead(model, scaler, last_seq, steps_ahead=steps, exog_future=exog_future)
+    if track_errors:
+        _record_forecast(
+            _cache_key(model_type, granularity, model_metric),
+            future_timestamps(timestamps[-1], steps, _HISTORY_FREQ[granularity]),
+            forecast_values,
+        )
+    bands = None
+    if intervals:
+        bands = forecast_intervals(model, scaler, last_seq, steps_ahead=steps, exog_future=exog_future)
+    return forecast_values, stale, bands, selection
+
+
 def forecast_daily(
     hourly_data: np.ndarray,
     metric: str = "temp",
     model_type: str = "lstm",
+    stale_ok: bool = False,
+    timestamps: Optional[List[datetime]] = None,
+    intervals: bool = False,
+    history_loader: Optional[Callable[[], np.ndarray]] = None,
+    exog_temperature: Optional[np.ndarray] = None,
 ) -> Dict[str, any]:
     """
     Forecast 24 jam ke depan dari hourly data.
@@ -308,7 +1746,14 @@ def forecast_daily(
     Args:
         hourly_data: array of last 24-72 hours of data
         metric: nama metric (untuk logging dan cache key)
-        model_type: "lstm" atau "rnn"
+        model_type: "lstm", "rnn", "auto" (lstm vs rnn dipilih dari val_loss), atau
+                    model klasik ("snaive", "holt_winters", "ridge_ar")
+        stale_ok: jika True, jawab langsung dari model terakhir saat data berubah
+                  (retrain berjalan di background; tidak berlaku untuk model klasik)
+        timestamps: timestamp bucket per data point (fitur kalender untuk ridge_ar)
+        intervals: tambah band p10/p50/p90 (MC dropout, hanya lstm/rnn)
+        history_loader: histori penuh -> pakai model global (window-invariant, lihat resolve_global_model)
+        exog_temperature: temperatur per bucket (fitur exogenous energy_kwh, lihat exogenous.py)
         
     Returns:
         {
@@ -316,47 +1761,43 @@ def forecast_daily(
             "granularity": "daily",
             "forecast_hours": 24,
             "forecast": [...],
-            "model_used": str,
-            "cache_status": "loaded" atau "retrained"
+            "model_used": str (model_type=auto: pemenang, "LSTM" / "RNN"),
+            "stale": bool (True = model dilatih dari data lama, retrain di background),
+            "model_selection": {"selected", "scores", ...} (hanya model_type=auto),
+            "intervals": {"p10": [...], "p50": [...], "p90": [...], ...} (jika intervals=True)
         }
     """
-    # Ensure minimum data
-    if len(hourly_data) < LOOK_BACK:
-        raise ValueError(f"Data harus minimal {LOOK_BACK} data points")
-    
-    # Train model (dengan caching otomatis)
-    model, scaler = train_forecast_model(
-        hourly_data,
-        model_type=model_type,
-        granularity="daily",
-        metric=metric,
-        epochs=10
+    # Train model (dengan caching otomatis) + forecast 24 jam
+    forecast_values, stale, bands, selection = forecast_horizon(
+        hourly_data, model_type, "daily", metric, steps=24, epochs=10,
+        stale_ok=stale_ok, timestamps=timestamps, intervals=intervals,
+        history_loader=history_loader, exog_temperature=exog_temperature,
     )
     
-    # Get last sequence (normalized)
-    normalized_data, _ = normalize_data(hourly_data)
-    last_seq = normalized_data[-LOOK_BACK:]
-    
-    # Forecast 24 hours
-    forecast_values = forecast_ahead(model, scaler, last_seq, steps_ahead=24)
-    
-    # Cleanup
-    del model
-    tf.keras.backend.clear_session()
-    
-    return {
+    result = {
         "metric": metric,
         "granularity": "daily",
         "forecast_hours": 24,
         "forecast": forecast_values.tolist(),
-        "model_used": model_type.upper(),
+        "model_used": (selection["selected"] if selection else model_type).upper(),
+        "stale": stale,
     }
+    if selection is not None:
+        result["model_selection"] = selection
+    if bands is not None:
+        result["intervals"] = bands
+    return result
 
 
 def forecast_weekly(
     daily_data: np.ndarray,
     metric: str = "temp",
     model_type: str = "lstm",
+    stale_ok: bool = False,
+    timestamps: Optional[List[datetime]] = None,
+    intervals: bool = False,
+    history_loader: Optional[Callable[[], np.ndarray]] = None,
+    exog_temperature: Optional[np.ndarray] = None,
 ) -> Dict[str, any]:
     """
     Forecast 7 hari ke depan dari daily aggregated data.
@@ -365,7 +1806,14 @@ def forecast_weekly(
     Args:
         daily_data: array of last 14-30 days of daily data
         metric: nama metric (untuk logging dan cache key)
-        model_type: "lstm" atau "rnn"
+        model_type: "lstm", "rnn", "auto" (lstm vs rnn dipilih dari val_loss), atau
+                    model klasik ("snaive", "holt_winters", "ridge_ar")
+        stale_ok: jika True, jawab langsung dari model terakhir saat data berubah
+                  (retrain berjalan di background; tidak berlaku untuk model klasik)
+        timestamps: timestamp bucket per data point (fitur kalender untuk ridge_ar)
+        intervals: tambah band p10/p50/p90 (MC dropout, hanya lstm/rnn)
+        history_loader: histori penuh -> pakai model global (window-invariant, lihat resolve_global_model)
+        exog_temperature: temperatur per bucket (fitur exogenous energy_kwh, lihat exogenous.py)
         
     Returns:
         {
@@ -374,39 +1822,29 @@ def forecast_weekly(
             "forecast_days": 7,
             "forecast": [...],
             "model_used": str,
+            "stale": bool,
         }
     """
-    # Ensure minimum data
-    if len(daily_data) < LOOK_BACK:
-        raise ValueError(f"Data harus minimal {LOOK_BACK} data points")
-    
-    # Train model (dengan caching otomatis)
-    model, scaler = train_forecast_model(
-        daily_data,
-        model_type=model_type,
-        granularity="weekly",
-        metric=metric,
-        epochs=15
+    # Train model (dengan caching otomatis) + forecast 7 hari
+    forecast_values, stale, bands, selection = forecast_horizon(
+        daily_data, model_type, "weekly", metric, steps=7, epochs=15,
+        stale_ok=stale_ok, timestamps=timestamps, intervals=intervals,
+        history_loader=history_loader, exog_temperature=exog_temperature,
     )
     
-    # Get last sequence (normalized)
-    normalized_data, _ = normalize_data(daily_data)
-    last_seq = normalized_data[-LOOK_BACK:]
-    
-    # Forecast 7 days
-    forecast_values = forecast_ahead(model, scaler, last_seq, steps_ahead=7)
-    
-    # Cleanup
-    del model
-    tf.keras.backend.clear_session()
-    
-    return {
+    result = {
         "metric": metric,
         "granularity": "weekly",
         "forecast_days": 7,
         "forecast": forecast_values.tolist(),
-        "model_used": model_type.upper(),
+        "model_used": (selection["selected"] if selection else model_type).upper(),
+        "stale": stale,
     }
+    if selection is not None:
+        result["model_selection"] = selection
+    if bands is not None:
+        result["intervals"] = bands
+    return result
 
 
 
@@ -414,6 +1852,11 @@ def forecast_monthly(
     monthly_data: np.ndarray,
     metric: str = "temp",
     model_type: str = "lstm",
+    stale_ok: bool = False,
+    timestamps: Optional[List[datetime]] = None,
+    intervals: bool = False,
+    history_loader: Optional[Callable[[], np.ndarray]] = None,
+    exog_temperature: Optional[np.ndarray] = None,
 ) -> Dict[str, any]:
     """
     Forecast 30 hari ke depan dari monthly data (atau daily dalam range bulan).
@@ -422,39 +1865,205 @@ def forecast_monthly(
     Args:
         monthly_data: array of last 2-3 months of daily data
         metric: nama metric
-        model_type: "lstm" atau "rnn"
+        model_type: "lstm", "rnn", "auto" (lstm vs rnn dipilih dari val_loss), atau
+                    model klasik ("snaive", "holt_winters", "ridge_ar")
+        stale_ok: jika True, jawab langsung dari model terakhir saat data berubah
+                  (retrain berjalan di background; tidak berlaku untuk model klasik)
+        timestamps: timestamp bucket per data point (fitur kalender untuk ridge_ar)
+        intervals: tambah band p10/p50/p90 (MC dropout, hanya lstm/rnn)
+        history_loader: histori penuh -> pakai model global (window-invariant, lihat resolve_global_model)
+        exog_temperature: temperatur per bucket (fitur exogenous energy_kwh, lihat exogenous.py)
         
     Returns:
         {
             "metric": str,
             "granularity": "monthly",
             "forecast_days": 30,
-            "forecast": [...]
+            "forecast": [...],
+            "model_used": str,
+            "stale": bool,
         }
     """
-    if len(monthly_data) < LOOK_BACK:
-        raise ValueError(f"Data harus minimal {LOOK_BACK} data points")
-    
-    model, scaler = train_forecast_model(
-        monthly_data,
-        model_type=model_type,
-        granularity="monthly",
-        metric=metric,
-        epochs=20
+    forecast_values, stale, bands, selection = forecast_horizon(
+        monthly_data, model_type, "monthly", metric, steps=30, epochs=20,
+        stale_ok=stale_ok, timestamps=timestamps, intervals=intervals,
+        history_loader=history_loader, exog_temperature=exog_temperature,
     )
     
-    normalized_data, _ = normalize_data(monthly_data)
-    last_seq = normalized_data[-LOOK_BACK:]
-    
-    forecast_values = forecast_ahead(model, scaler, last_seq, steps_ahead=30)
-    
-    del model
-    tf.keras.backend.clear_session()
-    
-    return {
+    result = {
         "metric": metric,
         "granularity": "monthly",
         "forecast_days": 30,
         "forecast": forecast_values.tolist(),
-        "model_used": model_type.upper(),
+        "model_used": (selection["selected"] if selection else model_type).upper(),
+        "stale": stale,
+    }
+    if selection is not None:
+        result["model_selection"] = selection
+    if bands is not None:
+        result["intervals"] = bands
+    return result
+
+
+# ======================== Multivariate (semua metric dalam satu model) ========================
+
+# (steps_ahead, max epochs) per granularity, sama dengan forecast_daily/weekly/monthly
+MULTIVARIATE_HORIZONS = {
+    "daily": (24, 10),
+    "weekly": (7, 15),
+    "monthly": (30, 20),
+}
+
+
+def build_multivariate_model(n_channels: int, model_type: str = "lstm", look_back: int = LOOK_BACK) -> Sequential:
+    """
+    Build model LSTM/SimpleRNN multivariate: input (look_back, n_channels),
+    output n_channels (next step untuk semua metric sekaligus).
+    """
+    keras = _tf().keras
+    if model_type == "lstm":
+        recurrent = keras.layers.LSTM(units=LSTM_UNITS, input_shape=(look_back, n_channels), return_sequences=False)
+    elif model_type == "rnn":
+        recurrent = keras.layers.SimpleRNN(units=RNN_UNITS, input_shape=(look_back, n_channels), return_sequences=False)
+    else:
+        raise ValueError("model_type harus 'lstm' atau 'rnn'")
+
+    model = keras.Sequential([
+        recurrent,
+        keras.layers.Dropout(DROPOUT_RATE),
+        keras.layers.Dense(units=max(16, 4 * n_channels), activation="relu"),
+        keras.layers.Dense(units=n_channels)
+    ])
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate=0.001), loss="mse")
+    return model
+
+
+def train_multivariate_model(
+    data: np.ndarray,
+    metrics: List[str],
+    model_type: str = "lstm",
+    granularity: str = "daily",
+    look_back: int = LOOK_BACK,
+    epochs: int = 20,
+    verbose: int = 0,
+    force_retrain: bool = False,
+) -> Tuple[Sequential, MinMaxScaler]:
+    """
+    Train satu model untuk semua metric (channel) sekaligus.
+    Scaler per-channel: MinMaxScaler di-fit per kolom.
+    
+    Args:
+        data: 2D array shape (timesteps, len(metrics))
+        metrics: nama metric per kolom (untuk cache key)
+        
+    Returns:
+        (trained_model, scaler)
+    """
+    if data.ndim != 2 or data.shape[1] != len(metrics):
+        raise ValueError("data harus 2D dengan satu kolom per metric")
+
+    model_tag = f"mv_{model_type}"
+    metric_key = "+".join(metrics)
+
+    data_hash = _get_data_hash(data)
+    if not force_retrain:
+        cached = _get_cached_model(model_tag, granularity, metric_key, data_hash)
+        if cached is not None:
+            return cached
+
+    return _TRAIN_EXECUTOR.run_once(
+        _train_job_key(model_tag, granularity, metric_key, data_hash),
+        _train_multivariate_model, data, metrics, model_type, granularity, look_back, epochs, verbose, force_retrain,
+    )
+
+
+def _train_multivariate_model(
+    data: np.ndarray,
+    metrics: List[str],
+    model_type: str,
+    granularity: str,
+    look_back: int,
+    epochs: int,
+    verbose: int,
+    force_retrain: bool,
+) -> Tuple[Sequential, MinMaxScaler]:
+    """Body train_multivariate_model; berjalan di thread _TRAIN_EXECUTOR."""
+    model_tag = f"mv_{model_type}"
+    metric_key = "+".join(metrics)
+    data_hash = _get_data_hash(data)
+    memory_key = (granularity, metric_key, model_tag, data_hash)
+
+    with _STORE.lock(_cache_key(model_tag, granularity, metric_key)):
+        if not force_retrain:
+            cached = _get_cached_model(model_tag, granularity, metric_key, data_hash)
+            if cached is not None:
+                return cached
+
+        scaler = _min_max_scaler(feature_range=(0, 1))
+        normalized_data = scaler.fit_transform(data)
+
+        # X: (batch, look_back, channels), y: (batch, channels)
+        n_channels = len(metrics)
+        with _TEMPLATE_POOL.acquire((model_type, look_back, n_channels, n_channels), reset=True) as keras_model:
+            training = _fit_with_budget(keras_model, normalized_data, look_back, epochs, verbose)
+            model = PooledForecaster.from_keras(keras_model)
+
+        _save_model_cache(
+            model_tag, granularity, metric_key, model, scaler, data_hash, len(data),
+            series=data, look_back=look_back, training=training,
+        )
+    _MODEL_CACHE.put(memory_key, (model, scaler), estimate_model_bytes(model))
+    _remember_last_good(model_tag, granularity, metric_key, (model, scaler))
+
+    return model, scaler
+
+
+def forecast_multivariate(
+    data: np.ndarray,
+    metrics: List[str],
+    granularity: str = "daily",
+    model_type: str = "lstm",
+) -> Dict[str, any]:
+    """
+    Forecast semua metric dengan satu training dan satu rollout.
+    
+    Args:
+        data: 2D array shape (timesteps, len(metrics)), hourly (daily) atau daily (weekly/monthly)
+        metrics: nama metric per kolom
+        granularity: "daily" (24 jam), "weekly" (7 hari), "monthly" (30 hari)
+        model_type: "lstm" atau "rnn"
+        
+    Returns:
+        {
+            "granularity": str,
+            "metrics": [...],
+            "forecast_steps": int,
+            "forecast": {metric: [...]},
+            "model_used": str,
+        }
+    """
+    if granularity not in MULTIVARIATE_HORIZONS:
+        raise ValueError("granularity harus 'daily', 'weekly', atau 'monthly'")
+    if len(data) < LOOK_BACK + 1:
+        raise ValueError(f"Data harus minimal {LOOK_BACK + 1} data points")
+
+    steps_ahead, epochs = MULTIVARIATE_HORIZONS[granularity]
+    model, scaler = train_multivariate_model(
+        data,
+        metrics,
+        model_type=model_type,
+        granularity=granularity,
+        epochs=epochs,
+    )
+
+    last_seq = scaler.transform(data[-LOOK_BACK:])
+    forecasts_normalized = _rollout_normalized(model, last_seq, steps_ahead)
+    forecast_values = scaler.inverse_transform(forecasts_normalized)
+
+    return {
+        "granularity": granularity,
+        "metrics": list(metrics),
+        "forecast_steps": steps_ahead,
+        "forecast": {m: forecast_values[:, i].tolist() for i, m in enumerate(metrics)},
+        "model_used": f"{model_type.upper()} (multivariate)",
     }
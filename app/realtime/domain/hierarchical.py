@@ -0,0 +1,142 @@
+"""
+Forecast hierarchical: semua horizon (24 jam / 7 hari / 30 hari) dari satu model hourly,
+opsional ditambah satu model harian, dengan angka harian yang direkonsiliasi.
+
+Mode biasa melatih tiga model per metric (hourly untuk daily, harian untuk weekly dan
+harian lagi untuk monthly) sehingga panel bisa saling bertentangan untuk hari yang sama.
+Di sini:
+- Model hourly (cache key granularity "daily", sama dengan panel daily) menghasilkan
+  forecast per jam.
+- Dengan model harian (use_daily_model=True, cache key "monthly"): satu rollout 30 hari
+  dipakai untuk weekly (7 hari pertama) dan monthly. Tanpa model harian: model hourly
+  di-rollout sampai akhir hari ke-30 dan diagregasi per hari.
+- Rekonsiliasi bottom-up: hari yang seluruh jamnya diketahui (aktual hari ini + forecast
+  hourly) memakai rata-rata jam tersebut, sehingga rata-rata forecast hourly selalu sama
+  dengan angka harian di panel weekly/monthly. Hari lain memakai model harian.
+
+Agregasi harian = rata-rata per jam, sama dengan bucket date_trunc('day') endpoint weekly/monthly.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .forecast import forecast_horizon
+
+HOURLY_STEPS = 24
+DAILY_STEPS = 30
+WEEKLY_STEPS = 7
+# Batas atas epoch (sama dengan forecast_daily / forecast_monthly)
+HOURLY_EPOCHS = 10
+DAILY_EPOCHS = 20
+
+
+def _day_index(ts: datetime, day0: datetime) -> int:
+    return (ts.replace(hour=0, minute=0, second=0, microsecond=0) - day0).days
+
+
+def reconcile_daily(
+    hourly_forecast: np.ndarray,
+    hourly_labels: List[datetime],
+    observed_today: np.ndarray,
+    daily_forecast: Optional[np.ndarray],
+    day0: datetime,
+    n_days: int = DAILY_STEPS,
+) -> np.ndarray:
+    """
+    Angka harian hasil rekonsiliasi bottom-up.
+
+    Args:
+        hourly_forecast, hourly_labels: forecast per jam + label waktunya (WIB)
+        observed_today: nilai aktual jam-jam hari ini sebelum forecast dimulai
+        daily_forecast: forecast model harian (index 0 = day0) atau None
+        day0: hari pertama (00:00 WIB)
+
+    Returns:
+        array n_days; hari dengan 24 jam lengkap = rata-rata jam, sisanya = model harian
+        (tanpa model harian: rata-rata jam yang tersedia)
+    """
+    sums = np.zeros(n_days)
+    counts = np.zeros(n_days, dtype=int)
+    sums[0] += float(np.sum(observed_today))
+    counts[0] += len(observed_today)
+    for value, label in zip(hourly_forecast, hourly_labels):
+        k = _day_index(label, day0)
+        if 0 <= k < n_days:
+            sums[k] += value
+            counts[k] += 1
+
+    bottom_up = np.divide(sums, counts, out=np.full(n_days, np.nan), where=counts > 0)
+    if daily_forecast is None:
+        return bottom_up
+    complete = counts >= 24
+    return np.where(complete, bottom_up, np.asarray(daily_forecast[:n_days], dtype=float))
+
+
+def forecast_hierarchy(
+    hourly_values: np.ndarray,
+    hourly_timestamps: List[datetime],
+    metric: str,
+    model_type: str,
+    ref_wib: datetime,
+    daily_values: Optional[np.ndarray] = None,
+    daily_timestamps: Optional[List[datetime]] = None,
+    stale_ok: bool = False,
+    hourly_history_loader: Optional[Callable[[], np.ndarray]] = None,
+    daily_history_loader: Optional[Callable[[], np.ndarray]] = None,
+) -> Dict[str, Any]:
+    """
+    Forecast daily/weekly/monthly yang konsisten dari model hourly (+ model harian jika
+    daily_values diberikan).
+
+    Args:
+        hourly_values, hourly_timestamps: histori per jam s/d jam ref (bucket WIB)
+        ref_wib: reference datetime; forecast jam ke-i berlabel ref_wib + i jam
+                 (sama dengan endpoint daily), hari ke-k berlabel tanggal ref + k hari
+        daily_values, daily_timestamps: histori harian untuk model harian (opsional)
+        hourly_history_loader, daily_history_loader: histori penuh -> model global
+                                                     (lihat forecast.resolve_global_model)
+
+    Returns:
+        {"daily": (24,), "weekly": (7,), "monthly": (30,), "stale": bool, "models": [...]}
+    """
+    day0 = ref_wib.replace(hour=0, minute=0, second=0, microsecond=0)
+    use_daily_model = daily_values is not None
+
+    # Tanpa model harian, rollout hourly harus mencakup sampai akhir hari ke-30
+    hours_left_today = 24 - ref_wib.hour
+    hourly_steps = HOURLY_STEPS if use_daily_model else hours_left_today + 24 * (DAILY_STEPS - 1)
+    hourly_forecast, stale, _, selection = forecast_horizon(
+        hourly_values, model_type, "daily", metric, steps=hourly_steps, epochs=HOURLY_EPOCHS,
+        stale_ok=stale_ok, timestamps=hourly_timestamps, history_loader=hourly_history_loader,
+    )
+    hourly_labels = [ref_wib + timedelta(hours=i) for i in range(hourly_steps)]
+    # model_type=auto: label memakai kandidat yang terpilih per model
+    models = [f"daily/{metric}/{selection['selected'] if selection else model_type}"]
+
+    daily_forecast = None
+    if use_daily_model:
+        daily_forecast, daily_stale, _, daily_selection = forecast_horizon(
+            daily_values, model_type, "monthly", metric, steps=DAILY_STEPS, epochs=DAILY_EPOCHS,
+            stale_ok=stale_ok, timestamps=daily_timestamps, history_loader=daily_history_loader,
+        )
+        stale = stale or daily_stale
+        models.append(f"monthly/{metric}/{daily_selection['selected'] if daily_selection else model_type}")
+
+    # Jam hari ini yang sudah terukur (sebelum jam ref; jam ref sendiri ikut diforecast)
+    observed_today = np.array([
+        v for v, ts in zip(hourly_values, hourly_timestamps)
+        if ts >= day0 and ts.hour < ref_wib.hour
+    ], dtype=float)
+
+    daily = reconcile_daily(hourly_forecast, hourly_labels, observed_today, daily_forecast, day0)
+    return {
+        "daily": np.asarray(hourly_forecast[:HOURLY_STEPS], dtype=float),
+        "weekly": daily[:WEEKLY_STEPS],
+        "monthly": daily,
+        "stale": stale,
+        "models": models,
+    }
@@ -0,0 +1,105 @@
+"""
+In-process LRU cache untuk forecast models yang sudah dilatih / di-load.
+
+Key: (granularity, metric, model_type, data_hash)
+Value: (model, scaler) + estimasi ukuran memori (bytes)
+
+Eviction berdasarkan jumlah entry (max_entries) dan total memori (max_bytes),
+opsional TTL per entry (ttl_s; dipakai juga untuk cache response forecast).
+Thread-safe karena endpoint FastAPI sync berjalan di threadpool.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def estimate_model_bytes(model: Any) -> int:
+    """Estimasi memori model dari total ukuran weights (float32)."""
+    try:
+        return int(sum(w.nbytes for w in model.get_weights()))
+    except Exception:
+        return 0
+
+
+class ModelLRUCache:
+    """Bounded LRU cache dengan hit/miss/eviction counters."""
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_s: Optional[float] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._items: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[2] is not None and item[2] <= time.monotonic():
+                self._items.pop(key)
+                self._bytes -= item[1]
+                self.expirations += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: int = 0) -> None:
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            expires_at = time.monotonic() + self.ttl_s if self.ttl_s else None
+            self._items[key] = (value, nbytes, expires_at)
+            self._bytes += nbytes
+            self._evict()
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def _evict(self) -> None:
+        # Entry terbaru selalu dipertahankan walau sendirian melebihi max_bytes
+        while len(self._items) > 1 and (
+            len(self._items) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, nbytes, _) = self._items.popitem(last=False)
+            self._bytes -= nbytes
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "ttl_s": self.ttl_s,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,167 @@
+"""
+Content-addressed, concurrency-safe store untuk forecast models di disk.
+
+Layout (root = settings.FORECAST_STORE_DIR):
+    blobs/ab/<sha256>.<ext>   file immutable (h5 / npz / pkl / npy), nama = hash isi
+    manifests/<key>.json      manifest per cache key: metadata + referensi blob
+    locks/<key>.lock          fcntl lock per key (training + simpan, lintas worker)
+    state/<key><ext>          state kecil per key yang boleh ditimpa (log forecast retrain policy)
+    tmp/                      file sementara sebelum di-rename atomik
+
+Manifest ditulis atomik (tmp + fsync + os.replace), jadi reader tidak pernah melihat
+file setengah jadi. Blob tidak pernah ditimpa: manifest lama tetap valid sampai
+manifest baru menggantikannya, dan blob yatim dibersihkan oleh collect_garbage().
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: lock antar proses tidak tersedia
+    fcntl = None
+
+BLOB_CHUNK_BYTES = 1024 * 1024
+# Blob yatim baru dihapus setelah umur ini (reader yang baru baca manifest lama masih aman)
+GC_MIN_AGE_S = 600
+
+
+class ModelStore:
+    """Penyimpanan model bersama untuk semua worker (dan restart) di satu host."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.manifest_dir = os.path.join(root, "manifests")
+        self.lock_dir = os.path.join(root, "locks")
+        self.state_dir = os.path.join(root, "state")
+        self.tmp_dir = os.path.join(root, "tmp")
+        for d in (self.blob_dir, self.manifest_dir, self.lock_dir, self.state_dir, self.tmp_dir):
+            os.makedirs(d, exist_ok=True)
+
+    # ---------- Locking ----------
+
+    @contextlib.contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Exclusive lock per key (flock). Tidak reentrant: jangan nested untuk key yang sama.
+        Dipakai juga antar thread dalam satu proses karena setiap pemanggilan membuka fd baru.
+        """
+        with open(os.path.join(self.lock_dir, f"{key}.lock"), "a+") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # ---------- Blobs ----------
+
+    def tmp_path(self, suffix: str) -> str:
+        """Path sementara di dalam store (filesystem sama -> os.replace atomik)."""
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.tmp_dir)
+        os.close(fd)
+        return path
+
+    def put_file(self, src_path: str, ext: str) -> str:
+        """Pindahkan file ke blob content-addressed. Returns ref relatif ("ab/<sha>.ext")."""
+        digest = hashlib.sha256()
+        with open(src_path, "rb") as f:
+            for chunk in iter(lambda: f.read(BLOB_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        sha = digest.hexdigest()
+        ref = os.path.join(sha[:2], f"{sha}{ext}")
+        dst = os.path.join(self.blob_dir, ref)
+        # Isi identik sudah ada: sentuh mtime-nya agar blob yatim lama yang dipakai ulang tidak
+        # dihapus collect_garbage (dipicu save key lain) sebelum manifest baru ditulis
+        try:
+            os.utime(dst)
+            os.remove(src_path)
+            return ref
+        except FileNotFoundError:
+            pass  # belum ada (atau baru saja dihapus GC): pindahkan file ini
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        os.replace(src_path, dst)
+        return ref
+
+    def put_bytes(self, data: bytes, ext: str) -> str:
+        path = self.tmp_path(ext)
+        with open(path, "wb") as f:
+            f.write(data)
+        return self.put_file(path, ext)
+
+    def blob_path(self, ref: str) -> str:
+        return os.path.join(self.blob_dir, ref)
+
+    # ---------- Manifests ----------
+
+    def read_manifest(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.manifest_dir, f"{key}.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_manifest(self, key: str, manifest: Dict[str, Any]) -> None:
+        path = self.tmp_path(".json")
+        with open(path, "w") as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path, os.path.join(self.manifest_dir, f"{key}.json"))
+
+    # ---------- State ----------
+
+    def read_state(self, key: str, ext: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.state_dir, f"{key}{ext}"), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def write_state(self, key: str, data: bytes, ext: str) -> None:
+        """Timpa state key secara atomik (tanpa fsync: state boleh hilang saat crash)."""
+        path = self.tmp_path(ext)
+        with open(path, "wb") as f:
+            f.write(data)
+        os.replace(path, os.path.join(self.state_dir, f"{key}{ext}"))
+
+    # ---------- Garbage collection ----------
+
+    def collect_garbage(self, min_age_s: float = GC_MIN_AGE_S) -> int:
+        """Hapus blob yang tidak direferensikan manifest mana pun (dan cukup lama). Returns jumlah file."""
+        referenced = set()
+        for name in os.listdir(self.manifest_dir):
+            if name.endswith(".json"):
+                manifest = self.read_manifest(name[:-5]) or {}
+                referenced.update(manifest.get("files", {}).values())
+
+        now = time.time()
+        removed = 0
+        for sub in os.listdir(self.blob_dir):
+            sub_dir = os.path.join(self.blob_dir, sub)
+            for name in os.listdir(sub_dir):
+                path = os.path.join(sub_dir, name)
+                if os.path.join(sub, name) in referenced:
+                    continue
+                try:
+                    if now - os.path.getmtime(path) >= min_age_s:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        # File tmp yatim (worker crash di tengah simpan)
+        for name in os.listdir(self.tmp_dir):
+            path = os.path.join(self.tmp_dir, name)
+            try:
+                if now - os.path.getmtime(path) >= min_age_s:
+                    os.remove(path)
+            except OSError:
+                pass
+        return removed
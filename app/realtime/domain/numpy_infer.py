@@ -0,0 +1,264 @@
+"""
+Pure-NumPy inference engine untuk forecaster LSTM / SimpleRNN.
+
+Model dari build_lstm_model / build_rnn_model (dan versi multivariate) di-export
+ke file .npz ringkas berisi weights + spec layer + parameter MinMaxScaler.
+Forward pass (LSTM gates, SimpleRNN, Dense+ReLU) dihitung dengan NumPy sehingga
+worker serving tidak perlu import TensorFlow maupun sklearn.
+
+Catatan:
+- Urutan gate LSTM mengikuti Keras: input, forget, cell, output
+- Dropout diabaikan saat inference (sama seperti training=False); rate-nya disimpan di
+  layer Dense berikutnya ("input_dropout") untuk MC dropout (rollout_samples)
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+NPZ_FORMAT_VERSION = 1
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x: np.ndarray) -> np.ndarray:
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0.0)
+
+
+def _linear(x: np.ndarray) -> np.ndarray:
+    return x
+
+
+ACTIVATIONS = {
+    "sigmoid": _sigmoid,
+    "hard_sigmoid": _hard_sigmoid,
+    "tanh": np.tanh,
+    "relu": _relu,
+    "linear": _linear,
+}
+
+
+class NumpyMinMaxScaler:
+    """Pengganti MinMaxScaler (transform/inverse_transform saja) tanpa sklearn."""
+
+    def __init__(self, min_: np.ndarray, scale_: np.ndarray):
+        self.min_ = np.asarray(min_, dtype=np.float64)
+        self.scale_ = np.asarray(scale_, dtype=np.float64)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) * self.scale_ + self.min_
+
+    def inverse_transform(self, X: np.ndarray) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.min_) / self.scale_
+
+
+def exog_rows(exog: Optional[np.ndarray], steps: int) -> np.ndarray:
+    """Fitur exogenous per step rollout; model tanpa exogenous -> (steps, 0)."""
+    if exog is None:
+        return np.zeros((steps, 0), dtype=np.float32)
+    return np.asarray(exog, dtype=np.float32)
+
+
+class NumpyForecaster:
+    """Forward pass NumPy untuk stack Sequential [LSTM|SimpleRNN] -> Dropout -> Dense -> Dense."""
+
+    def __init__(self, layers: List[Dict[str, Any]], input_shape: Tuple[int, int]):
+        self.layers = layers
+        self.input_shape = (None,) + tuple(input_shape)
+
+    # ---------- Forward pass ----------
+
+    @staticmethod
+    def _lstm(x: np.ndarray, layer: Dict[str, Any]) -> np.ndarray:
+        W, U, b = layer["weights"]
+        act = ACTIVATIONS[layer["activation"]]
+        rec_act = ACTIVATIONS[layer["recurrent_activation"]]
+        units = U.shape[0]
+        batch = x.shape[0]
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        # Proyeksi input semua timestep sekaligus, recurrence tetap per step
+        xw = x @ W + b
+        for t in range(x.shape[1]):
+            z = xw[:, t, :] + h @ U
+            i = rec_act(z[:, :units])
+            f = rec_act(z[:, units:2 * units])
+            g = act(z[:, 2 * units:3 * units])
+            o = rec_act(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * act(c)
+        return h
+
+    @staticmethod
+    def _simple_rnn(x: np.ndarray, layer: Dict[str, Any]) -> np.ndarray:
+        W, U, b = layer["weights"]
+        act = ACTIVATIONS[layer["activation"]]
+        h = np.zeros((x.shape[0], U.shape[0]), dtype=np.float32)
+        xw = x @ W + b
+        for t in range(x.shape[1]):
+            h = act(xw[:, t, :] + h @ U)
+        return h
+
+    @staticmethod
+    def _dense(x: np.ndarray, layer: Dict[str, Any]) -> np.ndarray:
+        W, b = layer["weights"]
+        return ACTIVATIONS[layer["activation"]](x @ W + b)
+
+    def predict(self, X: np.ndarray, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        X shape (batch, look_back, channels) -> (batch, outputs).
+        rng: jika diberikan, dropout aktif (MC dropout, setara training=True di Keras).
+        """
+        out = np.asarray(X, dtype=np.float32)
+        for layer in self.layers:
+            kind = layer["type"]
+            if kind == "LSTM":
+                out = self._lstm(out, layer)
+            elif kind == "SimpleRNN":
+                out = self._simple_rnn(out, layer)
+            elif kind == "Dense":
+                rate = layer.get("input_dropout", 0.0)
+                if rng is not None and rate > 0:
+                    out = out * (rng.random(out.shape) >= rate) / np.float32(1.0 - rate)
+                out = self._dense(out, layer)
+        return out
+
+    @property
+    def n_outputs(self) -> int:
+        return int(self.layers[-1]["weights"][1].shape[0])
+
+    def rollout(self, last_sequence: np.ndarray, steps: int, exog: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Autoregressive rollout dalam skala normalized.
+
+        Args:
+            last_sequence: shape (look_back, channels)
+            steps: jumlah step ke depan
+            exog: fitur exogenous (steps, channels - outputs) untuk model exogenous
+
+        Returns:
+            shape (steps, outputs)
+        """
+        seq = np.asarray(last_sequence, dtype=np.float32).copy()
+        exog = exog_rows(exog, steps)
+        outputs = np.empty((steps, self.n_outputs), dtype=np.float32)
+        for i in range(steps):
+            next_val = self.predict(seq[None, :, :])[0]
+            outputs[i] = next_val
+            # Update sequence: drop first, append predicted (+ fitur exogenous step ini)
+            next_row = np.concatenate([next_val, exog[i]])
+            seq = np.concatenate([seq[1:], next_row[None, :]], axis=0)
+        return outputs
+
+    def rollout_samples(
+        self,
+        last_sequence: np.ndarray,
+        steps: int,
+        n_samples: int,
+        rng: Optional[np.random.Generator] = None,
+        exog: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        N rollout MC dropout sekaligus sebagai satu batch (N, look_back, channels).
+
+        Returns:
+            shape (n_samples, steps, outputs), skala normalized
+        """
+        rng = rng or np.random.default_rng()
+        seq = np.repeat(np.asarray(last_sequence, dtype=np.float32)[None, :, :], n_samples, axis=0)
+        exog = exog_rows(exog, steps)
+        outputs = np.empty((n_samples, steps, self.n_outputs), dtype=np.float32)
+        for i in range(steps):
+            next_val = self.predict(seq, rng)
+            outputs[:, i] = next_val
+            next_row = np.concatenate([next_val, np.broadcast_to(exog[i], (n_samples, exog.shape[1]))], axis=1)
+            seq = np.concatenate([seq[:, 1:], next_row[:, None, :]], axis=1)
+        return outputs
+
+    def get_weights(self) -> List[np.ndarray]:
+        return [w for layer in self.layers for w in layer["weights"]]
+
+    # ---------- Export / load ----------
+
+    @classmethod
+    def from_keras(cls, model) -> "NumpyForecaster":
+        """Ambil weights dari model Keras (tanpa import TF di modul ini)."""
+        layers = []
+        dropout = 0.0
+        for layer in model.layers:
+            kind = type(layer).__name__
+            if kind == "Dropout":
+                dropout = float(layer.rate)
+                continue
+            if kind not in ("LSTM", "SimpleRNN", "Dense"):
+                raise ValueError(f"Layer {kind} tidak didukung NumPy engine")
+            spec = {
+                "type": kind,
+                "activation": layer.activation.__name__,
+                "weights": [np.asarray(w, dtype=np.float32) for w in layer.get_weights()],
+            }
+            if kind == "LSTM":
+                spec["recurrent_activation"] = layer.recurrent_activation.__name__
+            if kind == "Dense" and dropout > 0:
+                spec["input_dropout"] = dropout
+                dropout = 0.0
+            layers.append(spec)
+        return cls(layers, tuple(model.input_shape[1:]))
+
+    def save(self, path: str, scaler=None) -> None:
+        """Simpan ke .npz: spec JSON + weights (+ parameter scaler jika ada)."""
+        spec = {
+            "version": NPZ_FORMAT_VERSION,
+            "input_shape": list(self.input_shape[1:]),
+            "layers": [{k: v for k, v in layer.items() if k != "weights"} for layer in self.layers],
+        }
+        arrays = {"spec": np.array(json.dumps(spec))}
+        for i, layer in enumerate(self.layers):
+            for j, w in enumerate(layer["weights"]):
+                arrays[f"l{i}_w{j}"] = w
+        if scaler is not None:
+            arrays["scaler_min"] = np.asarray(scaler.min_, dtype=np.float64)
+            arrays["scaler_scale"] = np.asarray(scaler.scale_, dtype=np.float64)
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["NumpyForecaster", "NumpyMinMaxScaler"]:
+        """Load .npz hasil save(). Returns (forecaster, scaler atau None)."""
+        with np.load(path, allow_pickle=False) as npz:
+            spec = json.loads(str(npz["spec"]))
+            if spec.get("version") != NPZ_FORMAT_VERSION:
+                raise ValueError("Versi format .npz tidak cocok")
+            layers = []
+            for i, layer in enumerate(spec["layers"]):
+                n_weights = 3 if layer["type"] in ("LSTM", "SimpleRNN") else 2
+                layer = dict(layer)
+                layer["weights"] = [npz[f"l{i}_w{j}"] for j in range(n_weights)]
+                layers.append(layer)
+            scaler = None
+            if "scaler_min" in npz:
+                scaler = NumpyMinMaxScaler(npz["scaler_min"], npz["scaler_scale"])
+        return cls(layers, tuple(spec["input_shape"])), scaler
+
+
+def load_npz_scaler(path: str) -> Optional["NumpyMinMaxScaler"]:
+    """Load scaler saja dari .npz hasil export_npz (tanpa weights)."""
+    with np.load(path, allow_pickle=False) as npz:
+        if "scaler_min" not in npz:
+            return None
+        return NumpyMinMaxScaler(npz["scaler_min"], npz["scaler_scale"])
+
+
+def export_npz(model, scaler, path: str) -> None:
+    """Export model Keras + MinMaxScaler ke .npz untuk serving tanpa TensorFlow."""
+    NumpyForecaster.from_keras(model).save(path, scaler)
@@ -0,0 +1,223 @@
+"""
+Retrain policy untuk train_forecast_model: kapan model LSTM/RNN perlu dilatih ulang.
+
+Tanpa policy, setiap perubahan satu byte deret input (tiap jam ada bucket baru) berarti
+model baru. Policy di sini memutuskan apakah model yang sudah ada di store tetap dipakai
+(deret baru hanya jadi input rollout) atau dilatih ulang:
+
+- "data" (DataChangePolicy): latih ulang setiap data berubah (perilaku lama)
+- "drift" (DriftStalenessPolicy): latih ulang hanya jika model lebih tua dari budget
+  staleness, deret baru keluar dari range scaler, atau error forecast terealisasi
+  (terhadap bucket sensor_hourly yang sudah masuk) jauh lebih buruk daripada error validasi
+  model saat dilatih (rasio), dengan batas bawah absolut agar noise model yang sangat akurat
+  tidak memicu retrain
+
+Error terealisasi dicatat ringkas oleh ForecastErrorLog: per cache key satu ring kecil
+(timestamp target, prediksi, aktual) di state ModelStore (~16 byte per titik), diisi dari
+forecast yang dilayani dan dicocokkan dengan deret historis request berikutnya. Log terikat
+ke data_hash model; model baru memulai log kosong.
+
+Policy lain bisa didaftarkan lewat register_retrain_policy lalu dipilih dengan
+settings.FORECAST_RETRAIN_POLICY.
+"""
+
+import abc
+import io
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from .model_store import ModelStore
+
+# Ekstensi file state log forecast per cache key
+ERROR_LOG_EXT = ".forecast_log.npz"
+
+
+# ======================== Forecast Error Log ========================
+
+class ForecastErrorLog:
+    """
+    Ring per cache key: forecast yang dilayani + nilai aktual begitu bucket target terisi.
+    Update di bawah flock per key (ModelStore.lock), aman untuk thread maupun worker lain.
+    """
+
+    def __init__(self, store: ModelStore, capacity: int = 256):
+        self.store = store
+        self.capacity = capacity
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        # Lock terpisah dari lock training key yang sama (training bisa memegangnya lama)
+        return f"{key}{ERROR_LOG_EXT}"
+
+    @staticmethod
+    def _epoch(timestamps: List[datetime]) -> np.ndarray:
+        return np.array([int(ts.timestamp()) for ts in timestamps], dtype=np.int64)
+
+    def _read(self, key: str, model_hash: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(target, predicted, actual); kosong jika belum ada atau milik model lain."""
+        raw = self.store.read_state(key, ERROR_LOG_EXT)
+        if raw is not None:
+            try:
+                with np.load(io.BytesIO(raw), allow_pickle=False) as z:
+                    if str(z["model"]) == model_hash:
+                        return z["target"], z["predicted"], z["actual"]
+            except (OSError, ValueError, KeyError):
+                pass
+        return np.empty(0, np.int64), np.empty(0, np.float32), np.empty(0, np.float32)
+
+    def _write(self, key: str, model_hash: str, target, predicted, actual) -> None:
+        buf = io.BytesIO()
+        np.savez(buf, model=np.array(model_hash), target=target, predicted=predicted, actual=actual)
+        self.store.write_state(key, buf.getvalue(), ERROR_LOG_EXT)
+
+    def record(self, key: str, model_hash: str, target_timestamps: List[datetime], predicted: np.ndarray) -> None:
+        """Catat forecast untuk bucket target masa depan (forecast terbaru per target menggantikan yang lama)."""
+        new_target = self._epoch(target_timestamps)
+        new_pred = np.asarray(predicted, dtype=np.float32).reshape(-1)
+        # Read-modify-write di bawah flock: worker lain menulis file state yang sama
+        with self.store.lock(self._lock_key(key)):
+            target, pred, actual = self._read(key, model_hash)
+            # Target yang sudah terealisasi tidak ditimpa
+            fresh = ~np.isin(new_target, target[~np.isnan(actual)])
+            new_target, new_pred = new_target[fresh], new_pred[fresh]
+            replaced = np.isin(target, new_target)
+            if replaced.sum() == len(new_target) and np.allclose(
+                pred[replaced][np.argsort(target[replaced])], new_pred[np.argsort(new_target)], atol=1e-6
+            ):
+                return  # forecast identik sudah tercatat (request berulang tanpa data baru)
+            keep = ~replaced
+            target = np.concatenate([target[keep], new_target])[-self.capacity:]
+            pred = np.concatenate([pred[keep], new_pred])[-self.capacity:]
+            actual = np.concatenate([actual[keep], np.full(len(new_target), np.nan, np.float32)])[-self.capacity:]
+            self._write(key, model_hash, target, pred, actual)
+
+    def realize(self, key: str, model_hash: str, timestamps: List[datetime], values: np.ndarray) -> None:
+        """
+        Isi nilai aktual untuk target yang bucket-nya sudah ada di deret historis.
+        Bucket terakhir dilewati: agregasinya (jam / hari berjalan) bisa masih berubah.
+        """
+        if len(timestamps) < 2:
+            return
+        observed = self._epoch(timestamps[:-1])
+        values = np.asarray(values, dtype=np.float32).reshape(len(timestamps), -1)[:-1, 0]
+        with self.store.lock(self._lock_key(key)):
+            target, pred, actual = self._read(key, model_hash)
+            pending = np.isnan(actual) & np.isin(target, observed)
+            if not pending.any():
+                return
+            lookup = dict(zip(observed.tolist(), values.tolist()))
+            actual = actual.copy()
+            for i in np.flatnonzero(pending):
+                actual[i] = lookup[int(target[i])]
+            self._write(key, model_hash, target, pred, actual)
+
+    def recent_error(self, key: str, model_hash: str, window: int, min_points: int) -> Optional[float]:
+        """MAE `window` titik terealisasi terakhir (skala asli); None jika kurang dari min_points."""
+        target, pred, actual = self._read(key, model_hash)
+        done = ~np.isnan(actual)
+        if done.sum() < min_points:
+            return None
+        order = np.argsort(target[done])[-window:]
+        return float(np.mean(np.abs(pred[done][order] - actual[done][order])))
+
+
+# ======================== Policies ========================
+
+class ModelState:
+    """Input keputusan policy untuk model yang sedang dipakai satu cache key."""
+
+    def __init__(
+        self,
+        age_s: float,
+        range_excess: float,
+        recent_error: Optional[float],
+        baseline_error: Optional[float] = None,
+    ):
+        self.age_s = age_s
+        # Seberapa jauh deret baru keluar dari range scaler (fraksi range, 0 = di dalam)
+        self.range_excess = range_excess
+        # MAE forecast terealisasi dalam skala normalized (fraksi range scaler); None = belum cukup titik
+        self.recent_error = recent_error
+        # Error validasi saat training (RMSE normalized dari val_loss manifest); None = tidak ada
+        self.baseline_error = baseline_error
+
+
+class RetrainPolicy(abc.ABC):
+    """Basis policy: should_retrain -> (latih ulang?, alasan)."""
+
+    name = "base"
+    # False: selalu latih ulang saat data berubah (caller tidak perlu menghitung ModelState)
+    keeps_models = True
+    # True: forecast_horizon mencatat forecast + error terealisasi ke ForecastErrorLog
+    tracks_errors = False
+
+    @abc.abstractmethod
+    def should_retrain(self, state: ModelState) -> Tuple[bool, str]:
+        ...
+
+
+class DataChangePolicy(RetrainPolicy):
+    """Latih ulang setiap deret input berubah (data_hash beda)."""
+
+    name = "data"
+    keeps_models = False
+
+    def should_retrain(self, state: ModelState) -> Tuple[bool, str]:
+        return True, "data_changed"
+
+
+class DriftStalenessPolicy(RetrainPolicy):
+    """Pakai model lama selama masih muda, deret di dalam range scaler, dan error-nya rendah."""
+
+    name = "drift"
+    tracks_errors = True
+
+    def __init__(
+        self,
+        max_age_s: float,
+        error_ratio: float,
+        min_error: float,
+        range_tolerance: float = 0.1,
+    ):
+        self.max_age_s = max_age_s
+        self.error_ratio = error_ratio
+        self.min_error = min_error
+        self.range_tolerance = range_tolerance
+
+    def error_limit(self, state: ModelState) -> float:
+        if state.baseline_error is None:
+            return self.min_error
+        return max(self.min_error, self.error_ratio * state.baseline_error)
+
+    def should_retrain(self, state: ModelState) -> Tuple[bool, str]:
+        if state.age_s > self.max_age_s:
+            return True, "stale"
+        if state.range_excess > self.range_tolerance:
+            return True, "range_drift"
+        if state.recent_error is not None and state.recent_error > self.error_limit(state):
+            return True, "error_drift"
+        return False, "within_budget"
+
+
+RETRAIN_POLICIES: Dict[str, RetrainPolicy] = {
+    DataChangePolicy.name: DataChangePolicy(),
+    DriftStalenessPolicy.name: DriftStalenessPolicy(
+        max_age_s=settings.FORECAST_RETRAIN_MAX_AGE_S,
+        error_ratio=settings.FORECAST_RETRAIN_ERROR_RATIO,
+        min_error=settings.FORECAST_RETRAIN_MIN_ERROR,
+    ),
+}
+
+
+def register_retrain_policy(policy: RetrainPolicy) -> None:
+    RETRAIN_POLICIES[policy.name] = policy
+
+
+def get_retrain_policy(name: str) -> RetrainPolicy:
+    try:
+        return RETRAIN_POLICIES[name]
+    except KeyError:
+        raise ValueError(f"retrain policy tidak dikenal: {name} (pilihan: {', '.join(RETRAIN_POLICIES)})")
@@ -0,0 +1,138 @@
+"""
+Inference-only export forecaster LSTM / SimpleRNN ke TFLite (weights float16 atau int8).
+
+Export (saat training, butuh TensorFlow): graph model di-freeze dengan input statis
+(1, look_back, channels) lalu dikonversi dengan TFLiteConverter. Hasilnya hanya berisi
+op builtin (WHILE + FULLY_CONNECTED), tanpa optimizer state maupun objek Keras.
+
+Serving: file .tflite (puluhan KB) di-load dengan interpreter paling ringan yang tersedia:
+ai_edge_litert -> tflite_runtime -> tf.lite (fallback, ikut import TensorFlow).
+
+Catatan:
+- Quantization: "float16" (weights fp16, di-dequantize saat load) atau "int8"
+  (dynamic range: weights int8, aktivasi float)
+- Dropout tidak ada di graph inference; MC dropout (rollout_samples) memakai
+  NumpyForecaster dari .npz model yang sama jika tersedia, di-load saat forecaster dibuat
+  (blob .npz bisa dihapus collect_garbage setelah manifest-nya diganti)
+- Interpreter tidak thread-safe: setiap forecaster memegang lock sendiri
+"""
+
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from .numpy_infer import NumpyForecaster, exog_rows
+
+TFLITE_QUANTIZATIONS = ("none", "float16", "int8")
+
+
+def _interpreter_class():
+    """Interpreter TFLite paling ringan yang ter-install."""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+def export_tflite(model, path: str, quantization: str = "float16") -> None:
+    """Export model Keras (inference saja) ke file .tflite."""
+    if quantization not in TFLITE_QUANTIZATIONS:
+        raise ValueError(f"quantization harus salah satu dari {TFLITE_QUANTIZATIONS}")
+    import tensorflow as tf
+    from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+    def serve(x):
+        return model(x, training=False)
+
+    # Batch statis 1: tensor list LSTM harus ber-shape statis agar bisa di-lower ke op builtin
+    spec = tf.TensorSpec([1] + list(model.input_shape[1:]), tf.float32)
+    frozen = convert_variables_to_constants_v2(tf.function(serve).get_concrete_function(spec))
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([frozen])
+    if quantization != "none":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+
+
+class TFLiteForecaster:
+    """Rollout autoregressive di atas interpreter TFLite (API sama dengan NumpyForecaster)."""
+
+    def __init__(self, model_content: bytes, mc_engine_path: Optional[str] = None, num_threads: int = 1):
+        self._content = model_content
+        self._interpreter = _interpreter_class()(model_content=model_content, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._lock = threading.Lock()
+        self._mc_engine: Optional[NumpyForecaster] = None
+        if mc_engine_path is not None:
+            self._mc_engine, _ = NumpyForecaster.load(mc_engine_path)
+        self.input_shape = (None,) + tuple(int(d) for d in self._input["shape"][1:])
+        self.n_outputs = int(self._output["shape"][-1])
+
+    @classmethod
+    def load(cls, path: str, mc_engine_path: Optional[str] = None) -> "TFLiteForecaster":
+        with open(path, "rb") as f:
+            return cls(f.read(), mc_engine_path=mc_engine_path)
+
+    def _invoke(self, x: np.ndarray) -> np.ndarray:
+        self._interpreter.set_tensor(self._input["index"], x)
+        self._interpreter.invoke()
+        return self._interpreter.get_tensor(self._output["index"])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """X shape (batch, look_back, channels) -> (batch, outputs); satu invoke per baris."""
+        X = np.asarray(X, dtype=np.float32)
+        with self._lock:
+            return np.concatenate([self._invoke(X[i:i + 1]) for i in range(len(X))], axis=0)
+
+    def rollout(self, last_sequence: np.ndarray, steps: int, exog: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Autoregressive rollout dalam skala normalized.
+
+        Args:
+            last_sequence: shape (look_back, channels)
+            exog: fitur exogenous (steps, channels - outputs) untuk model exogenous
+
+        Returns:
+            shape (steps, outputs)
+        """
+        seq = np.asarray(last_sequence, dtype=np.float32)[None, :, :].copy()
+        exog = exog_rows(exog, steps)
+        outputs = np.empty((steps, self.n_outputs), dtype=np.float32)
+        with self._lock:
+            for i in range(steps):
+                next_val = self._invoke(seq)[0]
+                outputs[i] = next_val
+                next_row = np.concatenate([next_val, exog[i]])
+                seq = np.concatenate([seq[:, 1:], next_row[None, None, :]], axis=1)
+        return outputs
+
+    def rollout_samples(
+        self,
+        last_sequence: np.ndarray,
+        steps: int,
+        n_samples: int,
+        rng=None,
+        exog: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """MC dropout via NumpyForecaster (.npz) model yang sama; graph TFLite tidak punya dropout."""
+        if self._mc_engine is None:
+            raise ValueError("Prediction interval butuh export .npz model ini (tidak tersedia)")
+        return self._mc_engine.rollout_samples(last_sequence, steps, n_samples, rng, exog=exog)
+
+    def get_weights(self) -> List[np.ndarray]:
+        # Untuk estimate_model_bytes: ukuran flatbuffer (weights + graph) + engine MC dropout
+        mc_weights = self._mc_engine.get_weights() if self._mc_engine is not None else []
+        return [np.frombuffer(self._content, dtype=np.uint8)] + mc_weights
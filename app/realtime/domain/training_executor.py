@@ -0,0 +1,121 @@
+"""
+Executor training forecast yang terpisah dari threadpool request FastAPI.
+
+- Jumlah training paralel dibatasi (max_workers), sisanya antre sampai max_queue;
+  jika antrean penuh submit() langsung gagal dengan TrainingQueueFull (endpoint -> 503)
+  daripada menumpuk thread request yang menunggu.
+- Jumlah thread TensorFlow per op diatur terpisah (lihat forecast._tf), sehingga satu
+  retrain tidak memakai semua core dan endpoint /realtime/sensor/* tetap responsif.
+- run() dari dalam thread training sendiri dijalankan inline (tanpa deadlock).
+- Single-flight (submit_once/run_once): job dengan key yang sama yang masih antre/berjalan
+  dipakai bersama, sehingga N request untuk model yang sama = satu training. Antar worker
+  gunicorn dedup dilakukan caller dengan file lock per key + re-check cache (ModelStore.lock).
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable
+
+
+class TrainingQueueFull(RuntimeError):
+    """Antrean training penuh; caller sebaiknya coba lagi nanti."""
+
+
+class TrainingExecutor:
+    """Thread pool terbatas + antrean berkapasitas tetap untuk job training."""
+
+    def __init__(self, max_workers: int = 1, max_queue: int = 4, thread_name_prefix: str = "forecast-train"):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pending = 0  # job yang sedang jalan + antre
+        self._inflight: Dict[Hashable, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+
+    def in_worker(self) -> bool:
+        return getattr(self._local, "active", False)
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Jadwalkan job; raise TrainingQueueFull jika slot worker + antrean sudah habis."""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise TrainingQueueFull(
+                    f"Antrean training penuh ({self._pending} job); coba lagi beberapa saat lagi"
+                )
+            self._pending += 1
+            self.submitted += 1
+
+        def _job():
+            self._local.active = True
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._local.active = False
+
+        future = self._pool.submit(_job)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Submit lalu tunggu hasilnya (caller sync). Inline jika sudah di thread training."""
+        if self.in_worker():
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def submit_once(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Single-flight submit: jika job `key` masih antre/berjalan, kembalikan future-nya
+        (tidak memakai slot antrean). Raise TrainingQueueFull seperti submit().
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                with self._lock:
+                    self.coalesced += 1
+                return future
+            future = self.submit(fn, *args, **kwargs)
+            self._inflight[key] = future
+
+        def _forget(done: Future) -> None:
+            with self._inflight_lock:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+        future.add_done_callback(_forget)
+        return future
+
+    def run_once(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """submit_once lalu tunggu hasilnya. Inline jika sudah di thread training."""
+        if self.in_worker():
+            return fn(*args, **kwargs)
+        return self.submit_once(key, fn, *args, **kwargs).result()
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "coalesced": self.coalesced,
+                "inflight_keys": len(self._inflight),
+                "completed": self.completed,
+                "failed": self.failed,
+            }
@@ -0,0 +1,272 @@
+"""
+Data access untuk endpoint forecast (dipakai bersama router forecast dan forecast-energy/comfort).
+
+- Window historis + ekspresi bucket SQL (sama seperti grafik monitoring)
+- Deret agregat per bucket dari sensor_hourly
+- Watermark window (max ts, jumlah row, max created_at): query index murah untuk deteksi
+  perubahan. Jika watermark sama dengan saat deret terakhir diambil, deret dari cache
+  dipakai ulang tanpa menjalankan query agregasi GROUP BY.
+- Data epoch: counter per worker yang naik setiap ada data baru (insert scheduler atau
+  watermark berubah); dipakai sebagai bagian key cache response forecast.
+"""
+
+import itertools
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.core.config import settings
+from .db import get_conn
+from .domain.model_cache import ModelLRUCache
+
+WIB = ZoneInfo(settings.APP_TZ)
+
+# Semua metric yang bisa di-forecast (nama API -> kolom sensor_hourly)
+FORECAST_METRIC_COLUMNS = {
+    "temp": "temp",
+    "humidity": "humidity",
+    "wind_speed": "wind_speed",
+    "pm25": "pm25",
+    "co2": "co2",
+    "energy_kwh": "energy_kwh",
+    "ppv": "pmv",  # Alias pmv sebagai ppv
+    "ppd": "ppd",
+}
+
+# Key: (start, end, bucket_sql, metrics) -> (watermark, values, buckets)
+_SERIES_CACHE = ModelLRUCache(max_entries=settings.FORECAST_SERIES_CACHE_SIZE)
+
+_EPOCH_COUNTER = itertools.count(1)
+_EPOCH_LOCK = threading.Lock()
+_DATA_EPOCH = 0
+
+
+def data_epoch() -> int:
+    return _DATA_EPOCH
+
+
+def bump_data_epoch() -> int:
+    """Tandai ada data baru: semua response forecast yang di-cache sebelumnya tidak dipakai lagi."""
+    global _DATA_EPOCH
+    with _EPOCH_LOCK:
+        _DATA_EPOCH = next(_EPOCH_COUNTER)
+        return _DATA_EPOCH
+
+
+def calc_series_window(granularity: str, size: int, ref_wib: datetime) -> Tuple[datetime, datetime, str]:
+    """
+    Hitung start/end window (WIB) + ekspresi bucket SQL.
+    Sesuai dengan struktur grafik.py untuk konsistensi data.
+
+    Args:
+        granularity: "hourly" (untuk daily forecast) atau "daily" (untuk weekly/monthly)
+        size: jumlah unit historis (jam atau hari)
+        ref_wib: reference datetime (WIB)
+    """
+    if granularity == "hourly":
+        # Untuk daily forecast: ambil jam-jaman historis
+        end = ref_wib.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        start = end - timedelta(hours=size)
+        bucket_sql = "date_trunc('hour', (ts AT TIME ZONE %(tz)s))"
+    elif granularity == "daily":
+        # Untuk weekly/monthly forecast: ambil hari-hari historis
+        # Include full current day: end = besok 00:00 (UTC)
+        end = ref_wib.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        start = end - timedelta(days=size)
+        bucket_sql = "date_trunc('day', (ts AT TIME ZONE %(tz)s))"
+    else:  # "monthly"
+        # Untuk monthly (tidak dipakai sekarang)
+        end = ref_wib.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = (end.replace(day=28) + timedelta(days=4)).replace(day=1)
+        start = end - timedelta(days=31 * size)
+        bucket_sql = "date_trunc('month', (ts AT TIME ZONE %(tz)s))"
+
+    return start, end, bucket_sql
+
+
+def data_watermark(start_wib: datetime, end_wib: datetime) -> Tuple[Optional[datetime], int, Optional[datetime]]:
+    """
+    Watermark data di window: (max ts, jumlah row, max created_at).
+    Hanya memakai index ts (tanpa agregasi per bucket); berubah setiap ada insert/delete di window.
+    """
+    sql = """
+    SELECT MAX(ts), COUNT(*), MAX(created_at)
+    FROM sensor_hourly
+    WHERE ts >= %(t0)s AND ts < %(t1)s;
+    """
+    params = {
+        "t0": start_wib.astimezone(ZoneInfo("UTC")),
+        "t1": end_wib.astimezone(ZoneInfo("UTC")),
+    }
+    try:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(sql, params)
+            max_ts, count, max_created = cur.fetchone()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return max_ts, int(count), max_created
+
+
+def _fetch_buckets(
+    start_wib: datetime,
+    end_wib: datetime,
+    bucket_sql: str,
+    metrics: Tuple[str, ...],
+) -> Tuple[np.ndarray, List[datetime]]:
+    """Query agregasi per bucket (satu query untuk semua metric)."""
+    unknown = [m for m in metrics if m not in FORECAST_METRIC_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown metric: {', '.join(unknown)}")
+
+    select_cols = ",\n      ".join(f"AVG({FORECAST_METRIC_COLUMNS[m]}) AS m{i}" for i, m in enumerate(metrics))
+    sql = f"""
+    SELECT
+      {bucket_sql} AS bucket,
+      {select_cols}
+    FROM sensor_hourly
+    WHERE ts >= %(t0)s AND ts < %(t1)s
+    GROUP BY 1
+    ORDER BY 1 ASC;
+    """
+    params = {
+        "tz": settings.APP_TZ,
+        "t0": start_wib.astimezone(ZoneInfo("UTC")),
+        "t1": end_wib.astimezone(ZoneInfo("UTC")),
+    }
+
+    try:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    # Skip bucket yang punya nilai NULL di salah satu metric
+    rows = [r for r in rows if all(v is not None for v in r[1:])]
+    values = np.array([[float(v) for v in r[1:]] for r in rows]).reshape(len(rows), len(metrics))
+    # Bucket dari SQL berupa timestamp naive (WIB) -> dipakai fitur kalender model klasik
+    buckets = [r[0].replace(tzinfo=WIB) for r in rows]
+    return values, buckets
+
+
+def _cached_buckets(
+    start_wib: datetime,
+    end_wib: datetime,
+    bucket_sql: str,
+    metrics: Tuple[str, ...],
+) -> Tuple[np.ndarray, List[datetime]]:
+    """Deret per bucket; query agregasi hanya dijalankan jika watermark window berubah."""
+    watermark = data_watermark(start_wib, end_wib)
+    if watermark[1] == 0:
+        return np.empty((0, len(metrics))), []
+
+    key = (start_wib, end_wib, bucket_sql, metrics)
+    cached = _SERIES_CACHE.get(key)
+    if cached is not None and cached[0] == watermark:
+        return cached[1], cached[2]
+    if cached is not None:
+        # Data window berubah tanpa lewat scheduler worker ini (insert dari worker/proses lain)
+        bump_data_epoch()
+
+    values, buckets = _fetch_buckets(start_wib, end_wib, bucket_sql, metrics)
+    values.setflags(write=False)  # dibagi antar request
+    _SERIES_CACHE.put(key, (watermark, values, buckets), values.nbytes)
+    return values, buckets
+
+
+def series_bucket(
+    start_wib: datetime,
+    end_wib: datetime,
+    bucket_sql: str,
+    metric: str = "temp",
+    with_buckets: bool = False,
+):
+    """
+    Ambil deret agregat per bucket dari database (sama seperti grafik monitoring).
+    Filter menggunakan UTC agar index ts terpakai, bucket pakai WIB.
+
+    Args:
+        start_wib, end_wib: window time (WIB)
+        bucket_sql: SQL expression untuk bucketing
+        metric: salah satu FORECAST_METRIC_COLUMNS
+        with_buckets: ikut return timestamp bucket (WIB)
+
+    Returns:
+        numpy array dari aggregated values
+        (values, buckets) jika with_buckets=True
+    """
+    values, buckets = _cached_buckets(start_wib, end_wib, bucket_sql, (metric,))
+    if len(values) == 0:
+        raise HTTPException(status_code=404, detail=f"Tidak ada data untuk forecast ({metric}). Pastikan sensor_hourly table punya data.")
+
+    values = values[:, 0]
+    if with_buckets:
+        return values, buckets
+    return values
+
+
+def aligned_series(
+    start_wib: datetime,
+    end_wib: datetime,
+    bucket_sql: str,
+    metric: str,
+    buckets: List[datetime],
+) -> np.ndarray:
+    """
+    Deret `metric` sejajar dengan `buckets` (mis. temperatur untuk fitur exogenous energy).
+    Bucket yang tidak punya nilai diisi interpolasi linear dari bucket terdekat.
+    """
+    values, own_buckets = _cached_buckets(start_wib, end_wib, bucket_sql, (metric,))
+    if len(values) == 0:
+        raise HTTPException(status_code=404, detail=f"Tidak ada data {metric} untuk fitur exogenous")
+    by_bucket = dict(zip(own_buckets, values[:, 0]))
+    aligned = np.array([by_bucket.get(b, np.nan) for b in buckets], dtype=float)
+    missing = np.isnan(aligned)
+    if missing.any():
+        idx = np.arange(len(aligned))
+        aligned[missing] = np.interp(idx[missing], idx[~missing], aligned[~missing])
+    return aligned
+
+
+def series_bucket_multi(start_wib: datetime, end_wib: datetime, bucket_sql: str, metrics: List[str]) -> np.ndarray:
+    """
+    Ambil deret agregat per bucket untuk beberapa metric sekaligus (satu query).
+
+    Returns:
+        numpy array shape (n_buckets, len(metrics))
+    """
+    values, _ = _cached_buckets(start_wib, end_wib, bucket_sql, tuple(metrics))
+    if len(values) == 0:
+        raise HTTPException(status_code=404, detail="Tidak ada data untuk forecast. Pastikan sensor_hourly table punya data.")
+    return values
+
+
+def get_series_cache_stats() -> Dict[str, any]:
+    """Statistik cache deret historis (hit = query agregasi dilewati)."""
+    return _SERIES_CACHE.stats()
+
+
+# ======================== Timestamp Generators ========================
+
+def generate_hourly_timestamps(start_datetime: datetime, hours: int) -> List[str]:
+    """Generate list of hourly timestamps starting from start_datetime."""
+    timestamps = []
+    current = start_datetime
+    for i in range(hours):
+        timestamps.append(current.isoformat())
+        current += timedelta(hours=1)
+    return timestamps
+
+
+def generate_daily_timestamps(start_date: datetime, days: int) -> List[str]:
+    """Generate list of daily timestamps starting from start_date."""
+    timestamps = []
+    current = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    for i in range(days):
+        timestamps.append(current.date().isoformat())
+        current += timedelta(days=1)
+    return timestamps
@@ -3,148 +3,57 @@ Forecasting endpoints untuk daily, weekly, dan monthly forecasts.
 Menggunakan LSTM dan RNN models dari domain.forecast.
 Data source: sensor_hourly (sama seperti grafik monitoring)
 Automatic update: Model otomatis dilatih ulang setiap ada data baru dari database
+Precompute: request default (tanpa ref, histori default) dilayani dari tabel forecast_results
+            yang diisi scheduler setelah setiap insert; selain itu dihitung on-demand
 """
 
 from fastapi import APIRouter, Query, HTTPException
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-from typing import List, Literal, Tuple
-import numpy as np
+from datetime import datetime
+from typing import Literal
 
 from app.core.config import settings
-from ..db import get_conn
-from ..domain.forecast import forecast_daily, forecast_weekly, forecast_monthly
-import psycopg2.extras
+from ..domain.forecast import (
+    forecast_multivariate,
+    get_model_cache_stats,
+    get_template_pool_stats,
+    get_training_stats,
+    ModelType,
+)
+from ..domain.training_executor import TrainingQueueFull
+from ..forecast_data import (
+    FORECAST_METRIC_COLUMNS,
+    WIB,
+    calc_series_window,
+    generate_daily_timestamps,
+    generate_hourly_timestamps,
+    get_series_cache_stats,
+    series_bucket_multi,
+)
+from ..forecast_service import get_forecast_response, get_response_cache_stats, training_busy_error
 
 router = APIRouter(prefix="/forecast", tags=["Forecasting"])
-WIB = ZoneInfo(settings.APP_TZ)
-
-
-# ======================== Helper Functions (Same as Grafik Monitoring) ========================
-
-def _calc_series_window(granularity: str, size: int, ref_wib: datetime) -> Tuple[datetime, datetime, str]:
-    """
-    Hitung start/end window (WIB) + ekspresi bucket SQL.
-    Sesuai dengan struktur grafik.py untuk konsistensi data.
-    
-    Args:
-        granularity: "hourly" (untuk daily forecast) atau "daily" (untuk weekly/monthly)
-        size: jumlah unit historis (jam atau hari)
-        ref_wib: reference datetime (WIB)
-    """
-    if granularity == "hourly":
-        # Untuk daily forecast: ambil jam-jaman historis
-        end = ref_wib.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
-        start = end - timedelta(hours=size)
-        bucket_sql = "date_trunc('hour', (ts AT TIME ZONE %(tz)s))"
-    elif granularity == "daily":
-        # Untuk weekly/monthly forecast: ambil hari-hari historis
-        # Include full current day: end = besok 00:00 (UTC)
-        end = ref_wib.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
-        start = end - timedelta(days=size)
-        bucket_sql = "date_trunc('day', (ts AT TIME ZONE %(tz)s))"
-    else:  # "monthly"
-        # Untuk monthly (tidak dipakai sekarang)
-        end = ref_wib.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        end = (end.replace(day=28) + timedelta(days=4)).replace(day=1)
-        start = end - timedelta(days=31 * size)
-        bucket_sql = "date_trunc('month', (ts AT TIME ZONE %(tz)s))"
-    
-    return start, end, bucket_sql
-
-
-def _series_bucket(start_wib: datetime, end_wib: datetime, bucket_sql: str, metric: str = "temp") -> np.ndarray:
-    """
-    Ambil deret agregat per bucket dari database (sama seperti grafik monitoring).
-    Filter menggunakan UTC agar index ts terpakai, bucket pakai WIB.
-    
-    Args:
-        start_wib, end_wib: window time (WIB)
-        bucket_sql: SQL expression untuk bucketing
-        metric: "temp", "humidity", "wind_speed", "pm25", "co2"
-        
-    Returns:
-        numpy array dari aggregated values
-    """
-    t0_utc = start_wib.astimezone(ZoneInfo("UTC"))
-    t1_utc = end_wib.astimezone(ZoneInfo("UTC"))
-
-    metric_col_map = {
-        "temp": "temp",
-        "humidity": "humidity",
-        "wind_speed": "wind_speed",
-        "pm25": "pm25",
-        "co2": "co2",
-    }
-    
-    if metric not in metric_col_map:
-        raise ValueError(f"Unknown metric: {metric}")
-    
-    col_name = metric_col_map[metric]
-    sql = f"""
-    SELECT
-      {bucket_sql} AS bucket,
-      AVG({col_name}) AS metric_value
-    FROM sensor_hourly
-    WHERE ts >= %(t0)s AND ts < %(t1)s
-    GROUP BY 1
-    ORDER BY 1 ASC;
-    """
-    params = {"tz": settings.APP_TZ, "t0": t0_utc, "t1": t1_utc}
-
-    try:
-        with get_conn() as conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute(sql, params)
-            rows = cur.fetchall()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    
-    if not rows:
-        raise HTTPException(status_code=404, detail=f"Tidak ada data untuk forecast ({metric}). Pastikan sensor_hourly table punya data.")
-    
-    values = np.array([float(r["metric_value"]) for r in rows])
-    return values
-
-
-# ======================== Timestamp Generators ========================
-
-def _generate_hourly_timestamps(start_datetime: datetime, hours: int) -> List[str]:
-    """Generate list of hourly timestamps starting from start_datetime."""
-    timestamps = []
-    current = start_datetime
-    for i in range(hours):
-        timestamps.append(current.isoformat())
-        current += timedelta(hours=1)
-    return timestamps
-
-
-def _generate_daily_timestamps(start_date: datetime, days: int) -> List[str]:
-    """Generate list of daily timestamps starting from start_date."""
-    timestamps = []
-    current = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-    for i in range(days):
-        timestamps.append(current.date().isoformat())
-        current += timedelta(days=1)
-    return timestamps
-
 
 
 @router.get("/daily")
 def forecast_daily_endpoint(
-    model_type: Literal["lstm", "rnn"] = Query("lstm", description="Model type: lstm atau rnn"),
+    model_type: ModelType = Query("lstm", description="Model type: lstm, rnn, auto, snaive, holt_winters, ridge_ar"),
     metric: str = Query("temp", description="Metric: temp, humidity, wind_speed, pm25, co2"),
     hours: int = Query(72, ge=24, le=240, description="Historical hours untuk training (min 24, max 240)"),
-    ref_datetime: str = Query(None, description="Reference datetime ISO format (default: sekarang)")
+    ref_datetime: str = Query(None, description="Reference datetime ISO format (default: sekarang)"),
+    stale_ok: bool = Query(settings.FORECAST_STALE_WHILE_REVALIDATE, description="Jawab langsung dari model terakhir jika data berubah (retrain di background)"),
+    intervals: bool = Query(False, description="Tambah prediction interval p10/p50/p90 (MC dropout, hanya lstm/rnn)"),
 ):
     """
     Forecast 24 jam ke depan dari hourly historical data (dari database).
     Data automatically updated dari sensor_hourly.
     
     Query params:
-    - model_type: "lstm" atau "rnn"
+    - model_type: "lstm", "rnn", "auto" (pilih lstm/rnn terbaik), atau model klasik cepat "snaive", "holt_winters", "ridge_ar"
     - metric: "temp", "humidity", "wind_speed", "pm25", "co2"
     - hours: jumlah jam historis untuk training (min 24, recommended 72)
     - ref_datetime: ISO datetime reference (optional, default: sekarang)
+    - stale_ok: true = jawab langsung dari model terakhir saat data berubah, retrain di background
+    - intervals: true = tambah "intervals" (p10/p50/p90, MC dropout) dan band per timestamp
     
     Example:
     GET /realtime/forecast/daily?model_type=lstm&metric=temp&hours=72
@@ -156,6 +65,7 @@ def forecast_daily_endpoint(
         "forecast_hours": 24,
         "forecast": [23.5, 23.8, 24.1, ...],
         "model_used": "LSTM",
+        "stale": false,
         "ref_datetime": "2025-11-27T15:30:00+07:00",
         "forecast_start": "2025-11-27T15:30:00+07:00",
         "forecast_end": "2025-11-28T15:30:00+07:00",
@@ -168,36 +78,11 @@ def forecast_daily_endpoint(
         raise HTTPException(status_code=400, detail="ref_datetime harus ISO format (YYYY-MM-DDTHH:MM:SS)")
     
     try:
-        # Get historical hourly data (dari database, sama seperti grafik monitoring)
-        start, end, bucket_sql = _calc_series_window("hourly", hours, ref_wib)
-        hourly_vals = _series_bucket(start, end, bucket_sql, metric=metric)
-        
-        if len(hourly_vals) < 7:
-            raise HTTPException(status_code=400, detail=f"Data tidak cukup (butuh min 7 points, dapat {len(hourly_vals)})")
-        
-        # Forecast dengan model (otomatis cache/retrain)
-        result = forecast_daily(hourly_vals, metric=metric, model_type=model_type)
-        
-        # Add timestamps
-        forecast_start = ref_wib
-        forecast_end = forecast_start + timedelta(hours=24)
-        timestamps = _generate_hourly_timestamps(forecast_start, 24)
-        
-        # Create forecast with timestamps
-        forecast_with_ts = [
-            {"timestamp": ts, "value": float(val)}
-            for ts, val in zip(timestamps, result["forecast"])
-        ]
-        
-        result.update({
-            "ref_datetime": ref_wib.isoformat(),
-            "forecast_start": forecast_start.isoformat(),
-            "forecast_end": forecast_end.isoformat(),
-            "forecast_with_timestamps": forecast_with_ts,
-            "training_datapoints": len(hourly_vals),
-        })
-        
-        return result
+        # Cache response -> precompute scheduler (request default) -> on-demand
+        return get_forecast_response(
+            "daily", metric, model_type, hours, ref_wib,
+            default_ref=ref_datetime is None, stale_ok=stale_ok, intervals=intervals,
+        )
     
     except HTTPException:
         raise
@@ -207,20 +92,24 @@ def forecast_daily_endpoint(
 
 @router.get("/weekly")
 def forecast_weekly_endpoint(
-    model_type: Literal["lstm", "rnn"] = Query("lstm", description="Model type: lstm atau rnn"),
+    model_type: ModelType = Query("lstm", description="Model type: lstm, rnn, auto, snaive, holt_winters, ridge_ar"),
     metric: str = Query("temp", description="Metric: temp, humidity, wind_speed, pm25, co2"),
     days: int = Query(90, ge=14, le=90, description="Historical days untuk training (min 14, max 90)"),
-    ref_date: str = Query(None, description="Reference date ISO format (default: hari ini)")
+    ref_date: str = Query(None, description="Reference date ISO format (default: hari ini)"),
+    stale_ok: bool = Query(settings.FORECAST_STALE_WHILE_REVALIDATE, description="Jawab langsung dari model terakhir jika data berubah (retrain di background)"),
+    intervals: bool = Query(False, description="Tambah prediction interval p10/p50/p90 (MC dropout, hanya lstm/rnn)"),
 ):
     """
     Forecast 7 hari ke depan dari daily aggregated data (dari database).
     Data automatically updated setiap hari baru tersedia.
     
     Query params:
-    - model_type: "lstm" atau "rnn"
+    - model_type: "lstm", "rnn", "auto" (pilih lstm/rnn terbaik), atau model klasik cepat "snaive", "holt_winters", "ridge_ar"
     - metric: "temp", "humidity", "wind_speed", "pm25", "co2"
     - days: jumlah hari historis untuk training (min 14, recommended 30)
     - ref_date: ISO date reference (optional, default: hari ini)
+    - stale_ok: true = jawab langsung dari model terakhir saat data berubah, retrain di background
+    - intervals: true = tambah "intervals" (p10/p50/p90, MC dropout) dan band per timestamp
     
     Example:
     GET /realtime/forecast/weekly?model_type=lstm&metric=temp&days=30
@@ -232,6 +121,7 @@ def forecast_weekly_endpoint(
         "forecast_days": 7,
         "forecast": [25.3, 24.8, 23.9, 22.5, 21.8, 22.3, 23.5],
         "model_used": "LSTM",
+        "stale": false,
         "ref_date": "2025-11-27",
         "forecast_start": "2025-11-27",
         "forecast_end": "2025-12-04",
@@ -248,36 +138,11 @@ def forecast_weekly_endpoint(
         raise HTTPException(status_code=400, detail="ref_date harus ISO format (YYYY-MM-DD)")
     
     try:
-        # Get historical daily data (dari database) - sama logic dengan monthly
-        start, end, bucket_sql = _calc_series_window("daily", days, ref_wib)
-        daily_vals = _series_bucket(start, end, bucket_sql, metric=metric)
-        
-        if len(daily_vals) < 7:
-            raise HTTPException(status_code=400, detail=f"Data tidak cukup (butuh min 7 points, dapat {len(daily_vals)})")
-        
-        # Forecast
-        result = forecast_weekly(daily_vals, metric=metric, model_type=model_type)
-        
-        # Add timestamps and metadata
-        forecast_start = ref_wib.replace(hour=0, minute=0, second=0, microsecond=0)
-        forecast_end = forecast_start + timedelta(days=7)
-        timestamps = _generate_daily_timestamps(forecast_start, 7)
-        
-        # Create forecast with timestamps
-        forecast_with_ts = [
-            {"timestamp": ts, "value": float(val)}
-            for ts, val in zip(timestamps, result["forecast"])
-        ]
-        
-        result.update({
-            "ref_date": ref_wib.date().isoformat(),
-            "forecast_start": forecast_start.date().isoformat(),
-            "forecast_end": forecast_end.date().isoformat(),
-            "forecast_with_timestamps": forecast_with_ts,
-            "training_datapoints": len(daily_vals),
-        })
-        
-        return result
+        # Cache response -> precompute scheduler (request default) -> on-demand
+        return get_forecast_response(
+            "weekly", metric, model_type, days, ref_wib,
+            default_ref=ref_date is None, stale_ok=stale_ok, intervals=intervals,
+        )
     
     except HTTPException:
         raise
@@ -287,20 +152,24 @@ def forecast_weekly_endpoint(
 
 @router.get("/monthly")
 def forecast_monthly_endpoint(
-    model_type: Literal["lstm", "rnn"] = Query("lstm", description="Model type: lstm atau rnn"),
+    model_type: ModelType = Query("lstm", description="Model type: lstm, rnn, auto, snaive, holt_winters, ridge_ar"),
     metric: str = Query("temp", description="Metric: temp, humidity, wind_speed, pm25, co2"),
     days: int = Query(90, ge=30, le=365, description="Historical days untuk training (min 30, max 365)"),
-    ref_date: str = Query(None, description="Reference date ISO format (default: hari ini)")
+    ref_date: str = Query(None, description="Reference date ISO format (default: hari ini)"),
+    stale_ok: bool = Query(settings.FORECAST_STALE_WHILE_REVALIDATE, description="Jawab langsung dari model terakhir jika data berubah (retrain di background)"),
+    intervals: bool = Query(False, description="Tambah prediction interval p10/p50/p90 (MC dropout, hanya lstm/rnn)"),
 ):
     """
     Forecast 30 hari ke depan dari daily aggregated data (dari database).
     Data automatically updated setiap hari baru tersedia di database.
     
     Query params:
-    - model_type: "lstm" atau "rnn"
+    - model_type: "lstm", "rnn", "auto" (pilih lstm/rnn terbaik), atau model klasik cepat "snaive", "holt_winters", "ridge_ar"
     - metric: "temp", "humidity", "wind_speed", "pm25", "co2"
     - days: jumlah hari historis untuk training (min 30, recommended 90)
     - ref_date: ISO date reference (optional, default: hari ini)
+    - stale_ok: true = jawab langsung dari model terakhir saat data berubah, retrain di background
+    - intervals: true = tambah "intervals" (p10/p50/p90, MC dropout) dan band per timestamp
     
     Example:
     GET /realtime/forecast/monthly?model_type=lstm&metric=temp&days=90
@@ -312,6 +181,7 @@ def forecast_monthly_endpoint(
         "forecast_days": 30,
         "forecast": [25.3, 24.8, 23.9, ..., 26.1],
         "model_used": "LSTM",
+        "stale": false,
         "ref_date": "2025-11-27",
         "forecast_start": "2025-11-27",
         "forecast_end": "2025-12-27",
@@ -327,38 +197,108 @@ def forecast_monthly_endpoint(
         raise HTTPException(status_code=400, detail="ref_date harus ISO format (YYYY-MM-DD)")
     
     try:
-        # Get historical daily data (dari database)
-        start, end, bucket_sql = _calc_series_window("daily", days, ref_wib)
-        daily_vals = _series_bucket(start, end, bucket_sql, metric=metric)
-        
-        if len(daily_vals) < 7:
-            raise HTTPException(status_code=400, detail=f"Data tidak cukup (butuh min 7 points, dapat {len(daily_vals)})")
-        
-        # Forecast
-        result = forecast_monthly(daily_vals, metric=metric, model_type=model_type)
-        
-        # Add timestamps
-        forecast_start = ref_wib.replace(hour=0, minute=0, second=0, microsecond=0)
-        forecast_end = forecast_start + timedelta(days=30)
-        timestamps = _generate_daily_timestamps(forecast_start, 30)
-        
-        # Create forecast with timestamps
-        forecast_with_ts = [
-            {"timestamp": ts, "value": float(val)}
-            for ts, val in zip(timestamps, result["forecast"])
-        ]
-        
+        # Cache response -> precompute scheduler (request default) -> on-demand
+        return get_forecast_response(
+            "monthly", metric, model_type, days, ref_wib,
+            default_ref=ref_date is None, stale_ok=stale_ok, intervals=intervals,
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Forecast error: {str(e)}")
+
+
+@router.get("/all")
+def forecast_all_endpoint(
+    granularity: Literal["daily", "weekly", "monthly"] = Query("daily", description="daily (24 jam), weekly (7 hari), monthly (30 hari)"),
+    model_type: Literal["lstm", "rnn"] = Query("lstm", description="Model type: lstm atau rnn"),
+    metrics: str = Query(",".join(FORECAST_METRIC_COLUMNS), description="Daftar metric dipisah koma (default: semua)"),
+    hours: int = Query(72, ge=24, le=240, description="Historical hours untuk granularity daily"),
+    days: int = Query(90, ge=14, le=365, description="Historical days untuk granularity weekly/monthly"),
+    ref_datetime: str = Query(None, description="Reference datetime ISO format (default: sekarang)"),
+):
+    """
+    Forecast semua metric sekaligus dengan satu model multivariate
+    (satu query, satu training, satu inference).
+    
+    Example:
+    GET /realtime/forecast/all?granularity=daily&model_type=lstm
+    
+    Returns:
+    {
+        "granularity": "daily",
+        "metrics": ["temp", "humidity", ...],
+        "forecast_steps": 24,
+        "forecast": {"temp": [...], "humidity": [...], ...},
+        "model_used": "LSTM (multivariate)",
+        "timestamps": [...],
+        "training_datapoints": 72
+    }
+    """
+    try:
+        ref_wib = datetime.fromisoformat(ref_datetime).replace(tzinfo=WIB) if ref_datetime else datetime.now(tz=WIB)
+    except Exception:
+        raise HTTPException(status_code=400, detail="ref_datetime harus ISO format (YYYY-MM-DDTHH:MM:SS)")
+
+    metric_list = [m.strip() for m in metrics.split(",") if m.strip()]
+    if not metric_list:
+        raise HTTPException(status_code=400, detail="metrics tidak boleh kosong")
+
+    try:
+        if granularity == "daily":
+            start, end, bucket_sql = calc_series_window("hourly", hours, ref_wib)
+        else:
+            start, end, bucket_sql = calc_series_window("daily", days, ref_wib)
+        values = series_bucket_multi(start, end, bucket_sql, metric_list)
+
+        if len(values) < 8:
+            raise HTTPException(status_code=400, detail=f"Data tidak cukup (butuh min 8 points, dapat {len(values)})")
+
+        result = forecast_multivariate(values, metric_list, granularity=granularity, model_type=model_type)
+
+        if granularity == "daily":
+            forecast_start = ref_wib
+            timestamps = generate_hourly_timestamps(forecast_start, result["forecast_steps"])
+        else:
+            forecast_start = ref_wib.replace(hour=0, minute=0, second=0, microsecond=0)
+            timestamps = generate_daily_timestamps(forecast_start, result["forecast_steps"])
+
         result.update({
-            "ref_date": ref_wib.date().isoformat(),
-            "forecast_start": forecast_start.date().isoformat(),
-            "forecast_end": forecast_end.date().isoformat(),
-            "forecast_with_timestamps": forecast_with_ts,
-            "training_datapoints": len(daily_vals),
+            "ref_datetime": ref_wib.isoformat(),
+            "timestamps": timestamps,
+            "training_datapoints": len(values),
         })
-        
+
         return result
-    
+
     except HTTPException:
         raise
+    except TrainingQueueFull as e:
+        raise training_busy_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Forecast error: {str(e)}")
+
+
+@router.get("/cache/stats")
+def forecast_cache_stats():
+    """
+    Statistik cache di worker ini (hits, misses, evictions, memori):
+    - model_cache: model hasil training / load dari store
+    - series_cache: deret historis (hit = query agregasi dilewati karena watermark sama)
+    - response_cache: response endpoint daily/weekly/monthly (forecast, comfort, energy)
+    - training: executor training (job pending, ditolak karena antrean penuh, selesai, gagal)
+    - template_pool: template model Keras ter-compile per arsitektur (idle, build baru, hits)
+    
+    Example:
+    GET /realtime/forecast/cache/stats
+    """
+    return {
+        "model_cache": get_model_cache_stats(),
+        "series_cache": get_series_cache_stats(),
+        "response_cache": get_response_cache_stats(),
+        "training": get_training_stats(),
+        "template_pool": get_template_pool_stats(),
+    }
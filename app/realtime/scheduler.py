@@ -3,10 +3,13 @@ from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime
 from zoneinfo import ZoneInfo
 import logging
+import time
 
 from app.core.config import settings
 from .generator import generate_hour
 from .db import insert_row
+from .forecast_data import bump_data_epoch
+from .forecast_service import precompute_forecasts
 
 # gunakan AsyncIOScheduler agar satu event loop dengan FastAPI
 scheduler = AsyncIOScheduler(timezone=settings.APP_TZ)
@@ -19,8 +22,30 @@ def hourly_job():
         ts_hour = ts_now.replace(minute=0, second=0, microsecond=0)
         row = generate_hour(ts_hour)
         insert_row(row)
+        bump_data_epoch()  # response forecast yang di-cache worker ini tidak valid lagi
     except Exception:
         logging.exception("[scheduler] error saat hourly_job")
+        return
+
+    # Post-ingest: hitung ulang forecast default di job terpisah (insert tidak menunggu training)
+    if settings.FORECAST_PRECOMPUTE_ENABLED:
+        scheduler.add_job(
+            forecast_precompute_job,
+            id="forecast_precompute",
+            replace_existing=True,
+            misfire_grace_time=600,
+        )
+
+def forecast_precompute_job():
+    try:
+        t0 = time.perf_counter()
+        stats = precompute_forecasts()
+        logging.info(
+            "[scheduler] forecast precompute selesai dalam %.1fs (%d ok, %d gagal)",
+            time.perf_counter() - t0, stats["computed"], stats["failed"],
+        )
+    except Exception:
+        logging.exception("[scheduler] error saat forecast_precompute_job")
 
 def setup_scheduler():
     trigger = CronTrigger(minute=0, second=0, timezone=settings.APP_TZ)
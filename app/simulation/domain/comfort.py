@@ -2,7 +2,6 @@ from __future__ import annotations
 import numpy as np
 import math
 from typing import Dict, Optional
-from sklearn.neural_network import MLPRegressor
 
 def clip01(x):
     return np.clip(x, 0.0, 1.0)
@@ -2,10 +2,10 @@ from __future__ import annotations
 from typing import Any, Dict
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
 
 
 def fit_energy_regressor(df: pd.DataFrame) -> Dict[str, Any]:
+    from sklearn.linear_model import LinearRegression
     out = {"energy_regressor": None, "energy_min": None, "energy_max": None, "temp_min": None, "temp_max": None}
     if "EnergyConsumption" in df.columns and df["EnergyConsumption"].notna().any():
         valid = df[["temp", "EnergyConsumption"]].dropna()
@@ -2,15 +2,7 @@ from __future__ import annotations
 import numpy as np
 from typing import Dict
 
-from sklearn.linear_model import LinearRegression
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.neighbors import KNeighborsRegressor
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.svm import SVR
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-
-from xgboost import XGBRegressor
+# sklearn / xgboost di-import di dalam fungsi (lazy) agar startup app tetap ringan
 
 # evaluasi tetap dari modulmu yang lama
 from .comfort import evaluate_cont
@@ -35,6 +27,16 @@ def train_and_eval_all(
             ...
         }
     """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.tree import DecisionTreeRegressor
+    from sklearn.neighbors import KNeighborsRegressor
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.svm import SVR
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    from xgboost import XGBRegressor
+
     metrics: Dict[str, Dict] = {}
     # Build and fit requested models. We follow the user's explicit list:
     # Linear Regression, Decision Tree, KNN, SVM, Random Forest, XGBoost
@@ -96,6 +98,15 @@ def refit_final_model(best_model_name: str, X_full: np.ndarray, y_full: np.ndarr
     Nama `best_model_name` harus salah satu dari:
     "LinearRegression", "DecisionTree", "KNN", "SVM", "RandomForest", "XGBoost".
     """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.tree import DecisionTreeRegressor
+    from sklearn.neighbors import KNeighborsRegressor
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.svm import SVR
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    from xgboost import XGBRegressor
 
     if best_model_name == "LinearRegression":
         params = MODEL_PARAMS.get("LinearRegression", {})
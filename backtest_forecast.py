@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Rolling-origin backtest forecaster: akurasi (MAE/RMSE) + train time, inference time, peak RSS
+untuk setiap model_type x granularity. Hasil ditulis sebagai JSON (sort_keys) supaya
+bisa di-diff antar release.
+
+Jalankan dengan:
+    python backtest_forecast.py                               # deret sintetis (generator.generate_hour)
+    python backtest_forecast.py --source db --days 120        # data sensor_hourly
+    python backtest_forecast.py --model-types snaive,ridge_ar --granularities daily --origins 10
+    python backtest_forecast.py --model-types lstm,rnn --exog      # lstm/rnn tanpa vs dengan fitur kalender
+
+Logika backtest ada di app/realtime/domain/backtest.py.
+"""
+
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+from app.realtime.domain.backtest import (
+    BACKTEST_MODEL_TYPES,
+    run_backtest,
+    synthetic_hourly,
+)
+from app.realtime.generator import WIB
+
+
+def load_db_series(metric: str, days: int):
+    """Deret hourly `days` hari terakhir dari sensor_hourly (bucket sama seperti endpoint forecast)."""
+    from app.realtime.forecast_data import calc_series_window, series_bucket
+
+    start, end, bucket_sql = calc_series_window("hourly", days * 24, datetime.now(tz=WIB))
+    return series_bucket(start, end, bucket_sql, metric=metric, with_buckets=True)
+
+
+def _package_version(name: str):
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": _package_version("numpy"),
+        "tensorflow": _package_version("tensorflow"),
+    }
+
+
+def _round_floats(obj, ndigits: int = 4):
+    if isinstance(obj, float):
+        return round(obj, ndigits)
+    if isinstance(obj, dict):
+        return {k: _round_floats(v, ndigits) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_round_floats(v, ndigits) for v in obj]
+    return obj
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", choices=("synthetic", "db"), default="synthetic")
+    parser.add_argument("--metric", default="temp")
+    parser.add_argument("--days", type=int, default=150, help="panjang deret hourly (hari)")
+    parser.add_argument("--model-types", default=",".join(BACKTEST_MODEL_TYPES))
+    parser.add_argument("--granularities", default="daily,weekly,monthly")
+    parser.add_argument("--origins", type=int, default=5, help="jumlah rolling origin per kombinasi")
+    parser.add_argument("--stride", type=int, default=None, help="jarak antar origin (default = horizon)")
+    parser.add_argument("--seed", type=int, default=123, help="seed deret sintetis")
+    parser.add_argument("--exog", action="store_true", help="tambah varian lstm/rnn dengan fitur kalender")
+    parser.add_argument("--output", default="backtest_report.json")
+    args = parser.parse_args()
+
+    if args.source == "db":
+        values, timestamps = load_db_series(args.metric, args.days)
+    else:
+        values, timestamps = synthetic_hourly(args.days, args.metric, seed=args.seed)
+
+    model_types = [m.strip() for m in args.model_types.split(",") if m.strip()]
+    granularities = [g.strip() for g in args.granularities.split(",") if g.strip()]
+    results = run_backtest(values, timestamps, model_types, granularities, args.origins, args.stride, exog=args.exog)
+
+    report = _round_floats({
+        "generated_at": datetime.now(tz=WIB).isoformat(timespec="seconds"),
+        "config": {
+            "source": args.source,
+            "metric": args.metric,
+            "days": args.days,
+            "hourly_points": len(values),
+            "origins": args.origins,
+            "stride": args.stride,
+            "seed": args.seed if args.source == "synthetic" else None,
+            "exog": args.exog,
+        },
+        "environment": environment(),
+        "results": results,
+    })
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print(
+        f"{'model':<13} {'granularity':<8} {'mae':>8} {'rmse':>8} {'train_s':>8} "
+        f"{'infer_ms':>9} {'peak_mb':>8} {'+rss_mb':>8} {'epochs':>6}"
+    )
+    failed = 0
+    for r in report["results"]:
+        if "error" in r:
+            failed += 1
+            print(f"{r['model_type']:<13} {r['granularity']:<8} ERROR: {r['error']}")
+            continue
+        epochs = "-" if r["epochs_used_mean"] is None else f"{r['epochs_used_mean']:.1f}"
+        name = r["model_type"] + ("+exog" if r["exog"] else "")
+        print(
+            f"{name:<13} {r['granularity']:<8} {r['mae']:>8.3f} {r['rmse']:>8.3f} "
+            f"{r['train_s_mean']:>8.3f} {r['infer_ms_mean']:>9.1f} {r['peak_rss_mb']:>8.0f} {r['rss_delta_mb']:>8.1f} {epochs:>6}"
+        )
+    print(f"\nReport: {args.output}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
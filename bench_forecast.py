@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark latency forecast_ahead (per request) untuk horizon 24/7/30 step.
+Membandingkan legacy path (satu model.predict per step), fast path
+(seluruh rollout dalam satu compiled tf.function), NumPy engine (tanpa TF) dan TFLite.
+Di akhir: ukuran file dan waktu load model serving (.h5 vs .tflite float16/int8).
+
+Jalankan dengan: python bench_forecast.py [--repeat 5]
+Tidak butuh database: memakai deret sintetis dari generator.generate_hour.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.realtime.generator import generate_hour
+from app.realtime.domain.forecast import (
+    LOOK_BACK,
+    build_lstm_model,
+    build_rnn_model,
+    forecast_ahead,
+    normalize_data,
+    prepare_timeseries,
+)
+from app.realtime.domain.numpy_infer import NumpyForecaster
+from app.realtime.domain.tflite_infer import TFLiteForecaster, export_tflite
+
+WIB = ZoneInfo("Asia/Jakarta")
+HORIZONS = {"daily": 24, "weekly": 7, "monthly": 30}
+
+
+def synthetic_series(hours: int = 240) -> np.ndarray:
+    start = datetime.now(tz=WIB).replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours)
+    return np.array([generate_hour(start + timedelta(hours=i))["temp"] for i in range(hours)])
+
+
+def bench(fn, repeat: int) -> float:
+    """Median latency (ms) dari `repeat` kali pemanggilan fn."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = synthetic_series()
+    normalized, scaler = normalize_data(data)
+    X, y = prepare_timeseries(normalized, LOOK_BACK)
+    last_seq = normalized[-LOOK_BACK:]
+
+    print(
+        f"{'model':<6} {'granularity':<12} {'steps':>5} {'legacy_ms':>10} {'fast_ms':>10} "
+        f"{'numpy_ms':>10} {'tflite_ms':>10} {'speedup':>8}"
+    )
+    load_rows = []
+    for model_type, builder in (("lstm", build_lstm_model), ("rnn", build_rnn_model)):
+        model = builder(LOOK_BACK)
+        model.fit(X.reshape(-1, LOOK_BACK, 1), y, epochs=1, verbose=0)
+        np_model = NumpyForecaster.from_keras(model)
+        tmp_dir = tempfile.mkdtemp()
+        h5_path = os.path.join(tmp_dir, "model.h5")
+        model.save(h5_path, include_optimizer=False)
+        load_rows.append((model_type, "h5", h5_path, lambda p: tf_keras().models.load_model(p, compile=False)))
+        for quantization in ("float16", "int8"):
+            path = os.path.join(tmp_dir, f"model_{quantization}.tflite")
+            export_tflite(model, path, quantization)
+            load_rows.append((model_type, f"tflite/{quantization}", path, TFLiteForecaster.load))
+        tfl_model = TFLiteForecaster.load(os.path.join(tmp_dir, "model_float16.tflite"))
+
+        # Warm-up: trace pertama tidak dihitung (sama seperti worker yang sudah hangat)
+        forecast_ahead(model, scaler, last_seq, 1, fast=False)
+        forecast_ahead(model, scaler, last_seq, 1, fast=True)
+
+        for granularity, steps in HORIZONS.items():
+            legacy = bench(lambda: forecast_ahead(model, scaler, last_seq, steps, fast=False), args.repeat)
+            fast = bench(lambda: forecast_ahead(model, scaler, last_seq, steps, fast=True), args.repeat)
+            numpy_ms = bench(lambda: forecast_ahead(np_model, scaler, last_seq, steps), args.repeat)
+            tflite_ms = bench(lambda: forecast_ahead(tfl_model, scaler, last_seq, steps), args.repeat)
+            legacy_vals = forecast_ahead(model, scaler, last_seq, steps, fast=False)
+            diff = max(
+                np.abs(legacy_vals - forecast_ahead(model, scaler, last_seq, steps, fast=True)).max(),
+                np.abs(legacy_vals - forecast_ahead(np_model, scaler, last_seq, steps)).max(),
+            )
+            # float16 weights: selisih kecil yang diharapkan, dilaporkan terpisah
+            tflite_diff = np.abs(legacy_vals - forecast_ahead(tfl_model, scaler, last_seq, steps)).max()
+            print(
+                f"{model_type:<6} {granularity:<12} {steps:>5} {legacy:>10.1f} {fast:>10.1f} "
+                f"{numpy_ms:>10.1f} {tflite_ms:>10.1f} {legacy / min(fast, numpy_ms, tflite_ms):>7.1f}x  "
+                f"(max |diff|={diff:.2e}, tflite={tflite_diff:.2e})"
+            )
+
+    print(f"\n{'model':<6} {'format':<16} {'size_kb':>8} {'load_ms':>10}")
+    for model_type, fmt, path, loader in load_rows:
+        load_ms = bench(lambda: loader(path), args.repeat)
+        print(f"{model_type:<6} {fmt:<16} {os.path.getsize(path) / 1024:>8.1f} {load_ms:>10.1f}")
+
+
+def tf_keras():
+    import tensorflow as tf
+    return tf.keras
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Laporan startup-time dan import-time untuk `app.main`.
+
+- Mengukur wall time import app.main dan peak RSS di proses baru (cold).
+- Menampilkan modul dengan cumulative import time terbesar (python -X importtime).
+- Gagal (exit code 1) jika stack ML berat ikut ter-import saat startup,
+  sehingga regresi lazy import langsung terlihat.
+
+Jalankan dengan: python bench_startup.py [--top 15] [--json]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# Modul berat yang hanya boleh di-load saat training/inference pertama
+HEAVY_MODULES = ("tensorflow", "keras", "sklearn", "xgboost", "scipy")
+
+PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import app.main
+elapsed_ms = (time.perf_counter() - t0) * 1000.0
+print(json.dumps({
+    "import_ms": elapsed_ms,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    "loaded_heavy": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def probe_startup() -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_time_top(top: int) -> list:
+    """Top modul berdasarkan cumulative import time (us) dari -X importtime."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        head, cumulative_us, name = line.split("|")
+        self_us = head.split(":")[1]
+        rows.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000.0,
+            "cumulative_ms": int(cumulative_us) / 1000.0,
+        })
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="output JSON (untuk di-diff antar release)")
+    args = parser.parse_args()
+
+    report = probe_startup()
+    report["top_imports"] = import_time_top(args.top)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import app.main : {report['import_ms']:.0f} ms")
+        print(f"peak RSS        : {report['max_rss_mb']:.0f} MB")
+        print(f"heavy modules   : {', '.join(report['loaded_heavy']) or '-'}")
+        print()
+        print(f"{'cumulative_ms':>14} {'self_ms':>9}  module")
+        for r in report["top_imports"]:
+            print(f"{r['cumulative_ms']:>14.1f} {r['self_ms']:>9.1f}  {r['module']}")
+
+    if report["loaded_heavy"]:
+        print(f"\nFAIL: modul berat ter-import saat startup: {', '.join(report['loaded_heavy'])}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()